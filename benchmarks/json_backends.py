@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：json_backends.py
+描述：JSON库解析耗时基准测试，对比 response.json() 等价的标准库路径与已安装的 orjson/ujson
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+
+用法：
+    python benchmarks/json_backends.py [-n 次数] [响应文件 ...]
+
+不指定响应文件时使用生成的样例响应（专题页内容、排行榜、青龙环境变量列表）。
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import timeit
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils import json_utils
+
+
+def topic_page(depth: int = 4, width: int = 6) -> dict:
+    """生成与专题页 pageContent 结构相似的嵌套组件树。"""
+    def node(level, index):
+        item = {
+            'type': 'prod/compTask' if index % 3 == 0 else 'prod/compImage',
+            'label': f'组件{level}-{index}',
+            'props': {'taskId': str(index), 'hashId': f'h{level}{index}', 'rulesText': '活动规则说明' * 10,
+                      'style': {'width': 750, 'height': 320, 'margin': [0, 0, 12, 0]}},
+        }
+        if level < depth:
+            item['child'] = [node(level + 1, i) for i in range(width)]
+        return item
+    return {'name': '样例专题页', 'child': [node(1, i) for i in range(width)]}
+
+
+def rank_list(rows: int = 20) -> dict:
+    """生成与排行榜接口结构相同的响应。"""
+    return {'error_code': '0', 'data': {'rows': [
+        {'cell_type': '21001', 'article_id': str(80000000 + i), 'article_title': f'样例商品标题{i}' * 3,
+         'article_price': f'{i * 10 + 9.9:.1f}元', 'article_worthy': i * 3, 'article_unworthy': i,
+         'article_comment': i * 7, 'article_pic': f'https://example.com/{i}.jpg', 'tags': ['好价', '白菜']}
+        for i in range(rows)
+    ]}}
+
+
+def env_list(count: int = 200) -> dict:
+    """生成与青龙环境变量列表接口结构相同的响应。"""
+    return {'code': 200, 'data': [
+        {'id': i, 'name': f'ENV_{i}', 'value': 'x' * 64, 'remarks': '', 'status': 0,
+         'timestamp': 'Sun Oct 19 2026 08:00:00 GMT+0800', 'position': 4999999999.5 - i}
+        for i in range(count)
+    ]}
+
+
+def backends() -> dict:
+    """返回已安装的JSON库的解析函数。"""
+    found = {'json(response.json等价)': lambda content: json.loads(content.decode('utf-8'))}
+    for name in ('ujson', 'orjson'):
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            continue
+        found[name] = module.loads
+    found[f'json_utils({json_utils.BACKEND})'] = json_utils.loads
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='JSON库解析耗时基准测试')
+    parser.add_argument('files', nargs='*', help='保存的响应体文件')
+    parser.add_argument('-n', '--repeat', type=int, default=200, help='每次计时执行的次数')
+    args = parser.parse_args()
+
+    payloads = []
+    for path in args.files:
+        with open(path, 'rb') as f:
+            payloads.append((os.path.basename(path), f.read()))
+    if not payloads:
+        payloads = [
+            ('专题页内容', json.dumps(topic_page(), ensure_ascii=False).encode('utf-8')),
+            ('排行榜', json.dumps(rank_list(), ensure_ascii=False).encode('utf-8')),
+            ('青龙环境变量列表', json.dumps(env_list(), ensure_ascii=False).encode('utf-8')),
+        ]
+
+    loaders = backends()
+    for name, content in payloads:
+        expected = json.loads(content)
+        print(f"{name}（{len(content) / 1024:.1f} KB）")
+        baseline = None
+        for label, loader in loaders.items():
+            assert loader(content) == expected
+            seconds = min(timeit.repeat(lambda: loader(content), number=args.repeat, repeat=5)) / args.repeat
+            baseline = baseline or seconds
+            print(f"  {label:<28}{seconds * 1e6:>12.1f} us{baseline / seconds:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：payload_decode.py
+描述：什么值得买活动接口响应解码的基准测试，对比原先的正则+字符串解码实现与
+      str.find+memoryview+字节直接解析的实现
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+
+用法：
+    python benchmarks/payload_decode.py [-n 次数] [响应文件 ...]
+
+不指定响应文件时使用生成的样例响应；可以把 post.m.smzdm.com/ajax_m/activity/<id> 的响应体保存到文件后传入。
+"""
+
+import argparse
+import base64
+import json
+import os
+import re
+import sys
+import timeit
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'scripts'))
+
+from smzdm import extract_and_decode_base64
+from utils import json_utils
+
+
+def sample_payload(games: int) -> bytes:
+    """生成与活动接口响应结构相同的样例响应。"""
+    data = {
+        'info': {'title': '样例活动', 'start_time': '2026-01-01 00:00:00', 'end_time': '2099-01-01 00:00:00'},
+        'game_list': [
+            {'id': str(1000 + i), 'lottery_id': f'lt{i:06d}', 'title': f'任务{i}', 'desc': '浏览指定页面10秒' * 5}
+            for i in range(games)
+        ],
+    }
+    encoded = base64.b64encode(json.dumps(data, ensure_ascii=False).encode('utf-8')).decode('ascii')
+    return f"<script>var x = 1;</script><script>window.__data = JSON.parse(atob('{encoded}'));</script>".encode('utf-8')
+
+
+def legacy_decode(content: bytes):
+    """原先的实现：response.text 解码、正则查找、Base64解码为字符串后再解析。"""
+    text = content.decode('utf-8')
+    match = re.search(r"atob\('([^']*)'\)", text)
+    json_text = base64.b64decode(match.group(1)).decode('utf-8')
+    return json.loads(json_text)
+
+
+def bench(label: str, func, repeat: int) -> float:
+    seconds = min(timeit.repeat(func, number=repeat, repeat=5)) / repeat
+    print(f"  {label:<36}{seconds * 1e6:>12.1f}")
+    return seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='活动接口响应解码基准测试')
+    parser.add_argument('files', nargs='*', help='保存的响应体文件')
+    parser.add_argument('-n', '--repeat', type=int, default=1000, help='每次计时执行的次数')
+    args = parser.parse_args()
+
+    payloads = []
+    for path in args.files:
+        with open(path, 'rb') as f:
+            payloads.append((os.path.basename(path), f.read()))
+    if not payloads:
+        payloads = [(f'样例({games}个任务)', sample_payload(games)) for games in (20, 500)]
+
+    print(f"JSON库: {json_utils.BACKEND}")
+    for name, content in payloads:
+        expected = legacy_decode(content)
+        assert json_utils.loads(extract_and_decode_base64(content)) == expected
+        assert json.loads(extract_and_decode_base64(content)) == expected
+        print(f"{name}（{len(content) / 1024:.1f} KB）{'耗时(us)':>30}")
+        legacy = bench('原实现', lambda: legacy_decode(content), args.repeat)
+        stdlib = bench('find+memoryview，标准库解析字节', lambda: json.loads(extract_and_decode_base64(content)),
+                       args.repeat)
+        fast = bench(f'find+memoryview，{json_utils.BACKEND}解析字节',
+                     lambda: json_utils.loads(extract_and_decode_base64(content)), args.repeat)
+        print(f"  相对原实现：标准库 {legacy / stdlib:.2f}x，{json_utils.BACKEND} {legacy / fast:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
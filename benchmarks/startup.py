@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：startup.py
+描述：脚本启动耗时基准测试，统计各脚本导入路径（模块导入+日志初始化）的耗时
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+
+用法：
+    python benchmarks/startup.py [-n 次数] [脚本名 ...]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+DEFAULT_SCRIPTS = ['smzdm', 'longzhu', 'signin_type_1']
+
+# 在独立解释器中导入脚本模块（不执行 __main__ 分支），并输出导入耗时
+_IMPORT_SNIPPET = '''
+import importlib.util, sys, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('bench_target', sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+imported = time.perf_counter()
+from utils.config import config_loader
+config_loader.config_data
+loaded = time.perf_counter()
+print(f"{imported - start:.6f} {loaded - imported:.6f}")
+'''
+
+
+def measure_script(script: str, repeat: int) -> dict:
+    """测量单个脚本的导入耗时。
+
+    Args:
+        script: 脚本名称（不含扩展名）
+        repeat: 重复次数
+
+    Returns:
+        dict: 包含导入耗时、首次读取配置耗时和进程总耗时（秒）的中位数
+    """
+    path = os.path.join(project_root, 'scripts', f'{script}.py')
+    imports, configs = [], []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-c', _IMPORT_SNIPPET, path],
+            cwd=project_root, capture_output=True, text=True, check=True
+        )
+        import_time, config_time = result.stdout.split()[-2:]
+        imports.append(float(import_time))
+        configs.append(float(config_time))
+    return {
+        'import': statistics.median(imports),
+        'config': statistics.median(configs),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='脚本启动耗时基准测试')
+    parser.add_argument('scripts', nargs='*', default=DEFAULT_SCRIPTS, help='要测试的脚本名称')
+    parser.add_argument('-n', '--repeat', type=int, default=5, help='每个脚本的重复次数')
+    args = parser.parse_args()
+
+    print(f"{'脚本':<16}{'导入(ms)':>12}{'首次读取配置(ms)':>20}")
+    for script in args.scripts:
+        try:
+            stats = measure_script(script, args.repeat)
+        except subprocess.CalledProcessError as e:
+            print(f"{script:<16}导入失败: {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+            continue
+        print(f"{script:<16}{stats['import'] * 1000:>12.2f}{stats['config'] * 1000:>20.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：text_utils.py
+描述：HTML清理函数的微基准测试，对比原先逐条编译正则的实现与 utils.text_utils 的预编译、批量和缓存实现
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+
+用法：
+    python benchmarks/text_utils.py [-n 次数] [--accounts 账号数]
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.text_utils import clean_html, clean_html_batch, extract_tag_text
+
+# 接口返回的奖励消息样例
+SAMPLE_MESSAGES = [
+    '<span style="font-size: 15px;color: #333333;">经验<strong><span style="color: #f04848;">+10</span></strong></span>',
+    '恭喜你获得<span class="red">5</span>碎银子',
+    '<p>任务完成，获得 <b>金币+2</b></p>',
+    '阶段奖励：<span style="color:#e62828">经验+20 金币+5</span>',
+    '<div class="reward"><em>碎银子</em>+<i>10</i></div>',
+]
+
+
+def legacy_clean_html(html_string):
+    """原先 smzdm.clean_html 的实现：每次调用都编译正则。"""
+    pattern = re.compile(r'<[^>]+>')
+    return pattern.sub('', html_string).strip()
+
+
+def legacy_extract_tag_text(html_string):
+    """原先 _get_extra_reward 中的实现。"""
+    pattern = r'>([^<]+)<'
+    return ''.join(re.findall(pattern, html_string))
+
+
+def bench(label: str, func, repeat: int) -> float:
+    """执行基准测试并输出每轮（处理全部消息）的平均耗时（微秒）。"""
+    seconds = min(timeit.repeat(func, number=repeat, repeat=5)) / repeat
+    print(f"{label:<40}{seconds * 1e6:>12.2f}")
+    return seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='HTML清理函数微基准测试')
+    parser.add_argument('-n', '--repeat', type=int, default=2000, help='每次计时执行的轮数')
+    parser.add_argument('--accounts', type=int, default=10, help='模拟的账号数，各账号收到相同的奖励消息')
+    args = parser.parse_args()
+
+    messages = SAMPLE_MESSAGES * args.accounts
+    assert [legacy_clean_html(m) for m in messages] == clean_html_batch(messages)
+    assert [legacy_extract_tag_text(m) for m in messages] == [extract_tag_text(m) for m in messages]
+
+    print(f"{len(messages)} 条消息（{len(SAMPLE_MESSAGES)} 种 × {args.accounts} 个账号）")
+    print(f"{'实现':<40}{'每轮耗时(us)':>12}")
+    legacy = bench('逐条清理（原实现）', lambda: [legacy_clean_html(m) for m in messages], args.repeat)
+    uncached = bench('逐条清理（预编译，无缓存）', lambda: [clean_html.__wrapped__(m) for m in messages], args.repeat)
+    cached = bench('逐条清理（预编译+LRU缓存）', lambda: [clean_html(m) for m in messages], args.repeat)
+    batch = bench('批量清理', lambda: clean_html_batch(messages), args.repeat)
+    bench('提取标签文本（原实现）', lambda: [legacy_extract_tag_text(m) for m in messages], args.repeat)
+    bench('提取标签文本（预编译+LRU缓存）', lambda: [extract_tag_text(m) for m in messages], args.repeat)
+    print(f"相对原实现：预编译 {legacy / uncached:.1f}x，缓存 {legacy / cached:.1f}x，批量 {legacy / batch:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
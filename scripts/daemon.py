@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：daemon.py
+描述：常驻进程入口，在同一进程内按cron表达式定时运行各签到脚本
+      进程只需启动一次，工具模块、配置和HTTP连接池在多次运行之间复用
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+
+用法：
+    python scripts/daemon.py            # 按配置的定时规则运行
+    python scripts/daemon.py --run-now  # 启动后立即运行一次所有任务
+"""
+
+import argparse
+import os
+import signal
+import sys
+
+from loguru import logger
+
+# 将项目根目录添加到 sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.config import get_common_settings, start_config_watch
+from utils.http_utils import close_sessions
+from utils.log_utils import setup_logger
+from utils.plugin import available_plugins, load_plugin
+from utils.scheduler import Scheduler, start_health_server
+
+APP = 'daemon'
+
+# 未在配置中指定时使用的默认定时规则
+DEFAULT_JOBS = {
+    'smzdm': {'cron': '10 8 * * *', 'jitter': 600},
+    'longzhu': {'cron': '20 8 * * *', 'jitter': 600},
+    'signin_type_1': {'cron': '30 8 * * *', 'jitter': 300},
+    'smzdm_watch': {'cron': '*/10 * * * *', 'jitter': 60},
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='签到脚本常驻进程')
+    parser.add_argument('--run-now', action='store_true', help='启动后立即运行一次所有任务')
+    args = parser.parse_args()
+    setup_logger(APP)
+
+    settings = get_common_settings(APP) or {}
+    start_config_watch(settings.get('config_watch_interval', 5))
+
+    scheduler = Scheduler(max_workers=settings.get('max_workers', 2))
+    jobs = settings.get('jobs') or DEFAULT_JOBS
+    plugins = available_plugins()
+    for name, job_config in jobs.items():
+        if name not in plugins:
+            logger.error(f"未知的任务: {name}")
+            continue
+        if job_config.get('enabled', True):
+            scheduler.add_job(name, load_plugin(name).run, job_config['cron'], job_config.get('jitter', 0))
+
+    health_port = settings.get('health_port', 8765)
+    server = start_health_server(scheduler, settings.get('health_host', '127.0.0.1'), health_port) if health_port else None
+
+    def _shutdown(signum, frame):
+        logger.info("收到退出信号，等待正在运行的任务结束")
+        scheduler.stop()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    if args.run_now:
+        for name in scheduler.jobs:
+            scheduler.run_job_now(name)
+
+    scheduler.run_forever()
+    if server:
+        server.shutdown()
+    close_sessions()
+
+
+if __name__ == '__main__':
+    main()
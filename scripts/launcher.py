@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：launcher.py
+描述：脚本启动器，在同一进程内依次运行多个脚本插件
+      多个脚本共享配置、HTTP连接池、青龙令牌缓存和消息推送，只需启动一次解释器
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+
+用法：
+    python scripts/launcher.py                 # 运行所有插件
+    python scripts/launcher.py smzdm longzhu   # 只运行指定插件
+"""
+
+import argparse
+import os
+import sys
+
+from loguru import logger
+
+# 将项目根目录添加到 sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.http_utils import close_sessions
+from utils.log_utils import setup_logger
+from utils.notify_utils import notify_batch
+from utils.plugin import available_plugins, load_plugin
+
+APP = 'launcher'
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description='在同一进程内运行多个脚本')
+    parser.add_argument('plugins', nargs='*', help=f'要运行的插件，默认全部: {", ".join(available_plugins())}')
+    args = parser.parse_args()
+
+    plugins = [load_plugin(name) for name in (args.plugins or available_plugins())]
+    setup_logger(APP)
+
+    success = True
+    with notify_batch():
+        for plugin in plugins:
+            logger.info(f"开始运行 {plugin.name}")
+            try:
+                success = plugin.run() and success
+            except Exception as e:
+                success = False
+                logger.exception(f"{plugin.name} 运行异常: {str(e)}")
+    close_sessions()
+    return success
+
+
+if __name__ == '__main__':
+    if not main():
+        exit(1)
@@ -4,7 +4,9 @@ import json
 import datetime
 import sys
 import random
+import statistics
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # 第三方库
 import requests
@@ -17,32 +19,31 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 # 本地应用/库
+from utils import json_utils
 from utils.notify_utils import load_send
-from utils.config import get_app_configs, get_user_infos
+from utils.log_utils import setup_logger
+from utils.plugin import ScriptPlugin, register_plugin
 from utils.qlapi import QLApi
+from utils.rate_limit import AdaptiveRateController, get_rate_limiter
+from utils.retry import get_retry_engine
+from utils.state_store import QLEnvState
 urllib3.disable_warnings()
 
-# 配置日志输出
-logger.remove()
-logger.add(
-    os.path.join(project_root, "logs", "longzhu_debug.log"),
-    level="DEBUG",
-    rotation="1 day",
-    retention="7 days",
-    encoding="utf-8"
-)
-logger.add(
-    sys.stdout,
-    level="DEBUG",
-    filter=lambda record: record['level'].name != "DEBUG"
-)
-
 APP = 'longzhu'
 
 class longzhu:
     
-    def __init__(self, account, app_configs, log_level='DEBUG'):
-        self.session = requests.Session()
+    # 访问的主机，按 request_interval 设置默认限速，避免请求过于密集触发滑块验证
+    HOSTS = ('longzhu.longfor.com', 'gw2c-hw-open.longfor.com')
+    # 签到打卡请求单独限速，允许 sign_in.concurrency 个请求同时发出
+    CLOCK_LIMIT_KEY = 'longzhu.longfor.com/clock'
+    # 答题请求单独限速，允许 question.answer_concurrency 个请求同时发出
+    ANSWER_LIMIT_KEY = 'longzhu.longfor.com/answer'
+    TIMEOUT = 20
+    
+    def __init__(self, account, app_configs, session: requests.Session = None, log_level='DEBUG'):
+        # 同一账号的各流程共享一个会话（连接池），请求头按流程单独维护
+        self.session = session or requests.Session()
         self.user_token = account['token']
         self.app_configs = app_configs
         
@@ -65,52 +66,123 @@ class longzhu:
         }
         
         # 合并所有请求头
-        self.session.headers.update(base_headers)
-        self.session.headers.update(auth_headers)
-        self.session.headers.update(app_configs['sign_in']['header'])
+        self.headers = {**base_headers, **auth_headers, **app_configs['sign_in']['header']}
 
-    def _signinV2(self, activity_no: str):
+    def _request(self, method: str, url: str, rate_limited: bool = True, idempotent: bool = True,
+                 max_attempts: int = None, limit_key: str = None, **kwargs) -> requests.Response:
+        """使用当前流程的请求头发送请求，限速和重试由统一的重试引擎处理
+        
+        Args:
+            method: HTTP方法
+            url: 请求URL
+            rate_limited: 是否经过按主机限速器，只有由自适应控制器控制节奏的抽奖请求跳过
+            idempotent: 请求是否幂等，签到、抽奖等请求应传入False，避免重放
+            max_attempts: 最大尝试次数，为None时使用配置值
+            limit_key: 自定义的限速键，为None时按主机限速
+            **kwargs: 其他请求参数
+            
+        Returns:
+            requests.Response: 请求响应对象
+        """
+        kwargs.setdefault('timeout', self.TIMEOUT)
+        return get_retry_engine().request(
+            self.session, method, url, idempotent=idempotent, max_attempts=max_attempts,
+            rate_limited=rate_limited, limit_key=limit_key, headers=self.headers, verify=False, **kwargs
+        )
+
+    def _signinV2(self, activity_no: str) -> dict:
+        """对单个活动执行签到打卡
+        
+        Args:
+            activity_no: 活动编号
+            
+        Returns:
+            dict: 签到结果，包含 activity_no、success、code、message、reward 字段，
+                  backoff 表示该响应是否需要退避（验证码、错误码或请求异常）
+        """
         url = 'https://longzhu.longfor.com/proxy/lmarketing-task-api-mvc-prod/openapi/task/v1/signature/clock'
         data = {"activity_no": activity_no}
+        result = {'activity_no': activity_no, 'success': False, 'code': None,
+                  'message': '', 'reward': None, 'backoff': False}
+        backoff_codes = self.app_configs['sign_in'].get('backoff_codes')
         
         try:
-            res = self.session.post(url, json=data, verify=False)
+            res = self._request('POST', url, idempotent=False, limit_key=self.CLOCK_LIMIT_KEY, json=data)
             res.raise_for_status()
-            res_json = res.json()
+            res_json = json_utils.response_json(res)
+            result['code'] = res_json['code']
             
             if res_json['code'] != '0000':
-                error_msg = f"签到失败: {res_json.get('message', '未知错误')}"
-                logger.error(error_msg)
-                load_send(APP, error_msg)
-                return False
+                result['message'] = res_json.get('message', '未知错误')
+                result['backoff'] = backoff_codes is None or res_json['code'] in backoff_codes
+                logger.error(f"签到失败({activity_no}): {result['message']}")
+                return result
                 
             if res_json['data']['is_popup'] == 1:
-                reward_info = res_json['data']['reward_info']
-                logger.info(f"签到成功, 获得奖励: {reward_info}")
-                return True
+                result['success'] = True
+                result['reward'] = res_json['data']['reward_info']
+                logger.info(f"签到成功({activity_no}), 获得奖励: {result['reward']}")
+            else:
+                result['message'] = '未获得签到奖励'
                 
         except requests.exceptions.RequestException as e:
-            logger.error(f"请求异常: {str(e)}")
-            load_send(APP, f"请求异常: {str(e)}")
-            return False
+            result['message'] = f"请求异常: {str(e)}"
+            result['backoff'] = True
+            logger.error(f"请求异常({activity_no}): {str(e)}")
         
-        return False
+        return result
 
-    def signin(self):
-        results = []
-        for activity_no in self.app_configs['sign_in']['activity_no']:
-            results.append(self._signinV2(activity_no))
-        return all(results)
+    def signin(self) -> dict:
+        """并发执行所有活动的签到打卡
+        
+        并发数由 sign_in.concurrency 控制（默认2）。打卡请求使用单独的限速键，
+        前 concurrency 个请求可以同时发出，之后每 request_interval 秒放行一个。
+        收到错误码或验证码响应时，自适应控制器会放大后续请求的间隔，成功后逐步恢复。
+        
+        Returns:
+            dict: 汇总结果，包含 success（全部成功）、succeeded、failed 和 results 字段
+        """
+        sign_in_config = self.app_configs['sign_in']
+        activity_list = sign_in_config['activity_no']
+        controller = AdaptiveRateController(max_delay=sign_in_config.get('max_backoff', 30))
+        
+        def _clock(activity_no):
+            controller.wait()
+            result = self._signinV2(activity_no)
+            if result['backoff']:
+                controller.on_backoff()
+            else:
+                controller.on_success()
+            return result
+        
+        concurrency = max(1, min(int(sign_in_config.get('concurrency', 2)), len(activity_list)))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(_clock, activity_list))
+        
+        outcome = {
+            'success': all(result['success'] for result in results),
+            'succeeded': [result['activity_no'] for result in results if result['success']],
+            'failed': [result['activity_no'] for result in results if not result['success']],
+            'results': results,
+        }
+        failures = [f"{result['activity_no']}: {result['message']}" for result in results
+                    if not result['success'] and result['code'] != '0000']
+        if failures:
+            load_send(APP, "签到失败:\n" + "\n".join(failures))
+        logger.info(f"签到完成，成功 {len(outcome['succeeded'])} 个，失败 {len(outcome['failed'])} 个")
+        return outcome
 
 class longzhu_question(longzhu):
     
-    def __init__(self, account, app_configs):
-        super().__init__(account, app_configs)
+    def __init__(self, account, app_configs, session: requests.Session = None):
+        super().__init__(account, app_configs, session)
         self.qlapi = QLApi()
         self.KEY = 'longzhu_question1'
+        # 运行期间的状态修改先缓存，结束时一次性写回青龙
+        self.state = QLEnvState(self.KEY, self.qlapi)
         self.max_search_step = app_configs['question']['max_search_setp']
-        self.session.headers.update(app_configs['question']['header'])
-        logger.debug(f"初始化请求头: {self.session.headers}")
+        self.headers.update(app_configs['question']['header'])
+        logger.debug(f"初始化请求头: {self.headers}")
 
     def query_task(self, task_id: str) -> dict:
         """查询任务信息
@@ -127,10 +199,10 @@ class longzhu_question(longzhu):
         url = f'https://longzhu.longfor.com/proxy/lmarketing-task-api-prod/openapi/task/v1/information/list?task_id={task_id}'
         
         try:
-            res = self.session.get(url, verify=False)
+            res = self._request('GET', url)
             res.raise_for_status()
             logger.debug(f"查询任务响应: {res.text}")
-            return res.json()
+            return json_utils.response_json(res)
         except requests.exceptions.RequestException as e:
             logger.error(f"查询任务失败: {str(e)}")
             raise
@@ -162,16 +234,20 @@ class longzhu_question(longzhu):
             "item_content": json.dumps({"user_answer": user_answer})
         }
 
+        retries = self.app_configs['question'].get('answer_retries', 2)
         try:
-            res = self.session.post(url, json=data, verify=False)
+            # 提交答案会改变服务端状态，按非幂等请求处理：只在连接超时或服务端返回Retry-After时重试，
+            # 避免已提交成功的答案被重放；请求使用答题单独的限速键，不占用打卡和探测的请求间隔
+            res = self._request('POST', url, idempotent=False, max_attempts=retries + 1,
+                                limit_key=self.ANSWER_LIMIT_KEY, json=data)
             res.raise_for_status()
             logger.debug(f"回答问题响应: {res.text}")
-            ret_json = res.json()
+            ret_json = json_utils.response_json(res)
             if ret_json.get('code') == '0000':
                 logger.info(f"回答问题结果：{ret_json.get('data')}")
                 return True
-            else:
-                logger.error(f"回答问题失败: {ret_json.get('message')}")
+            logger.error(f"回答问题失败: {ret_json.get('message')}")
+            return False
         except requests.exceptions.RequestException as e:
             logger.error(f"回答问题失败: {str(e)}")
             return False
@@ -208,6 +284,144 @@ class longzhu_question(longzhu):
             logger.error(f"日期格式错误: {str(e)}")
             return False
     
+    # 查询的任务ID尚未开始（偏大）或已过期（偏小）时返回的错误码，探测时据此决定方向
+    CODE_NOT_STARTED = '801902'
+    CODE_EXPIRED = '801905'
+    # 环境变量中保留的历史任务ID数量
+    HISTORY_SIZE = 10
+
+    @staticmethod
+    def estimate_stride(history: list) -> float:
+        """根据历史记录估算每天任务ID的增量
+        
+        Args:
+            history: 历史记录列表，元素为 [日期字符串, 任务ID]
+            
+        Returns:
+            float: 相邻记录间每天任务ID增量的中位数，历史不足时返回1
+        """
+        points = sorted(
+            (datetime.datetime.strptime(date_str, '%Y-%m-%d'), task_id) for date_str, task_id in history
+        )
+        strides = []
+        for (prev_date, prev_id), (date, task_id) in zip(points, points[1:]):
+            days = (date - prev_date).days
+            if days > 0 and task_id > prev_id:
+                strides.append((task_id - prev_id) / days)
+        return statistics.median(strides) if strides else 1.0
+
+    @staticmethod
+    def _history(state: dict) -> list:
+        """从状态中取出历史记录，并确保包含状态中最近一次的任务ID"""
+        history = [list(item) for item in state.get('history') or []]
+        if [state['date'], state['task_id']] not in history:
+            history.append([state['date'], state['task_id']])
+        return history
+
+    def discover_task(self, state: dict) -> tuple:
+        """查找今天的问题任务ID
+        
+        根据历史记录估算的每天ID增量预测今天的任务ID并首先探测。预测值偏小（任务已过期）时
+        以1、2、4……的步长向上试探，偏大（任务未开始）时同样向下试探，两侧都确定后二分查找，
+        直到找到可用的任务、区间内已无候选ID或达到最大探测步数。预测准确时只需一两次查询。
+        
+        Args:
+            state: 环境变量中保存的状态，包含 date、task_id 和可选的 history
+            
+        Returns:
+            tuple: (任务ID, 查询结果)。未找到时任务ID为None，
+                   遇到非预期的错误码时查询结果为该错误响应，否则为None
+        """
+        last_id = state['task_id']
+        stride = self.estimate_stride(self._history(state))
+        days = self.count_days_to_now(state['date'])
+        task_id = last_id + max(1, round(stride * days))
+        logger.info(f"预测任务ID: {task_id}（每天增量 {stride:g}），最多探测 {self.max_search_step} 个ID")
+        
+        # 可用ID位于开区间 (low, high) 内，low 初始为上一次的任务ID，探测确认前不作为二分边界
+        low, high, low_probed = last_id, None, False
+        step = 1
+        for _ in range(self.max_search_step):
+            ret = self.query_task(task_id)
+            if ret['code'] == '0000':
+                return task_id, ret
+            if ret['code'] == self.CODE_EXPIRED:
+                low, low_probed = task_id, True
+            elif ret['code'] == self.CODE_NOT_STARTED:
+                high = task_id
+            else:
+                return None, ret
+            if high is not None and high - low <= 1:
+                break
+            if high is None:
+                task_id = low + step
+            elif not low_probed:
+                task_id = max(low + 1, high - step)
+            else:
+                task_id = (low + high) // 2
+            step *= 2
+            logger.info(f"任务ID不可用（{ret['code']}），继续探测 {task_id}")
+        return None, None
+
+    def _updated_state(self, state: dict, task_id: int) -> dict:
+        """生成记录今天任务ID的新状态
+        
+        Args:
+            state: 原状态
+            task_id: 今天的任务ID
+            
+        Returns:
+            dict: 新状态，包含 date、task_id 和 history，每天ID增量每次由 history 重新估算
+        """
+        today_str = datetime.datetime.now().strftime('%Y-%m-%d')
+        history = [item for item in self._history(state) if item[0] != today_str]
+        history = (history + [[today_str, task_id]])[-self.HISTORY_SIZE:]
+        return {
+            "date": today_str,
+            "task_id": task_id,
+            "history": history,
+        }
+
+    def _answer_all(self, task_id: int, ret: dict) -> bool:
+        """回答任务中所有未回答的问题
+        
+        Args:
+            task_id: 任务ID
+            ret: 任务查询结果
+            
+        Returns:
+            bool: 是否全部回答成功
+        """
+        pending = []
+        for item in ret['data']['information']:
+            if item['status'] == 0:
+                answers = json_utils.loads(item['content'])
+                logger.info(f'执行任务 {item["item_id"]}:{item["name"]}({len(answers["answer"])})')
+                # 输出答案选项
+                for i, answer_item in enumerate(answers["answer"]):
+                    logger.info(f"答案选项 {i+1}: {answer_item}")
+                pending.append((item, len(answers['answer'])))
+            else:
+                logger.warning(f'任务 {item["name"]} 已完成')
+        if not pending:
+            return True
+
+        def _answer_item(args):
+            item, answer_num = args
+            item_start = time.perf_counter()
+            success = self.answer(task_id, item['item_id'], answer_num)
+            return item, success, time.perf_counter() - item_start
+
+        # 各题目相互独立，在单账号并发上限内同时提交，答题限速键的突发量与并发数一致
+        start = time.perf_counter()
+        concurrency = max(1, min(int(self.app_configs['question'].get('answer_concurrency', 3)), len(pending)))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(_answer_item, pending))
+        for item, success, latency in results:
+            logger.info(f'题目 {item["item_id"]} {"回答成功" if success else "回答失败"}，耗时 {latency:.2f} 秒')
+        logger.info(f"共回答 {len(results)} 题，总耗时 {time.perf_counter() - start:.2f} 秒")
+        return all(success for _, success, _ in results)
+    
     def main(self) -> bool:
         """主执行方法
         
@@ -215,76 +429,47 @@ class longzhu_question(longzhu):
             bool: 是否成功执行所有任务
         """
         try:
-            env_value = self.qlapi.get_env(self.KEY)
-            json_str = json.loads(env_value['value'])
-            logger.debug(f"环境变量值: {json_str}")
+            state = json_utils.loads(self.state.load())
+            logger.debug(f"环境变量值: {state}")
             
-            task_id = json_str['task_id'] if self.is_today(json_str['date']) else \
-                     json_str['task_id'] + self.count_days_to_now(json_str['date'])
-            
-            logger.info(f"当前任务ID: {task_id}")
-            
-            success = False
-            step = 0
-            
-            while not success and step <= self.max_search_step:
-                try:
-                    ret = self.query_task(task_id)
-                    
-                    if ret['code'] == '0000':
-                        success = True
-                        today_str = datetime.datetime.now().strftime('%Y-%m-%d')
-                        
-                        for item in ret['data']['information']:
-                            if item['status'] == 0:
-                                answers = json.loads(item['content'])
-                                logger.info(f'执行任务 {item["item_id"]}:{item["name"]}({len(answers["answer"])})')
-                                # 输出答案选项
-                                for i, answer_item in enumerate(answers["answer"]):
-                                    logger.info(f"答案选项 {i+1}: {answer_item}")
-                                if not self.answer(task_id, item['item_id'], len(answers['answer'])):
-                                    return False
-                                
-                                if not self.is_today(json_str['date']):
-                                    self.qlapi.edit_env(self.KEY, json.dumps({
-                                        "date": today_str, 
-                                        "task_id": task_id
-                                    }))
-                            else:
-                                logger.warning(f'任务 {item["name"]} 已完成')
-                        
-                        return True
-                    
-                    elif (not self.is_today(json_str['date'])) and (ret['code'] in ('801902', '801905')):
-                        step += 1
-                        task_id += 1
-                        logger.info(f"尝试新任务ID: {task_id}")
+            if self.is_today(state['date']):
+                task_id = state['task_id']
+                ret = self.query_task(task_id)
+                if ret['code'] != '0000':
+                    logger.error(f"任务查询失败: {ret.get('message', '未知错误')}")
+                    load_send(APP, ret.get('message', '任务查询失败'))
+                    return False
+            else:
+                task_id, ret = self.discover_task(state)
+                if task_id is None:
+                    if ret is None:
+                        logger.warning('无法找到新的问题')
+                        load_send(APP, '无法找到新的问题')
                     else:
                         logger.error(f"任务查询失败: {ret.get('message', '未知错误')}")
                         load_send(APP, ret.get('message', '任务查询失败'))
-                        return False
-                        
-                except Exception as e:
-                    logger.error(f"处理任务异常: {str(e)}")
                     return False
+                self.state.set(json.dumps(self._updated_state(state, task_id)))
             
-            if step > self.max_search_step:
-                logger.warning('无法找到新的问题')
-                load_send(APP, '无法找到新的问题')
-                
-            return False
+            logger.info(f"当前任务ID: {task_id}")
+            return self._answer_all(task_id, ret)
             
         except Exception as e:
             logger.error(f"主流程异常: {str(e)}")
             return False
+        finally:
+            self.state.commit()
 
 class longzhu_lottery(longzhu):
     
-    def __init__(self, account, app_configs):
-        super().__init__(account, app_configs)
+    # 所有账号共享的抽奖节奏控制器，LongzhuPlugin.run() 每次运行时按 lottery.min_interval 重新创建
+    lottery_controller = AdaptiveRateController(min_delay=0.5)
+    
+    def __init__(self, account, app_configs, session: requests.Session = None):
+        super().__init__(account, app_configs, session)
         
         # 更新抽奖特定请求头
-        self.session.headers.update(app_configs['lottery']['header'])
+        self.headers.update(app_configs['lottery']['header'])
         
         # 设置认证相关请求头
         lottery_headers = {
@@ -292,15 +477,14 @@ class longzhu_lottery(longzhu):
             'channel': self.app_configs['channel'],
             'bucode': self.app_configs['bu_code']
         }
-        self.session.headers.update(lottery_headers)
+        self.headers.update(lottery_headers)
         
         # 移除不需要的请求头
         headers_to_remove = ['token', 'X-LF-UserToken', 'X-LF-Channel', 'X-LF-Bu-Code']
         for header in headers_to_remove:
-            if header in self.session.headers:
-                del self.session.headers[header]
+            self.headers.pop(header, None)
                 
-        logger.debug(f"抽奖请求头: {self.session.headers}")
+        logger.debug(f"抽奖请求头: {self.headers}")
     
     def lottery_sign(self) -> int:
         """签到获取抽奖机会
@@ -311,9 +495,9 @@ class longzhu_lottery(longzhu):
         url = 'https://gw2c-hw-open.longfor.com/llt-gateway-prod/api/v1/activity/auth/lottery/sign'
         
         try:
-            res = self.session.post(url, json=self.app_configs['lottery']['lottery_data'], verify=False)
+            res = self._request('POST', url, idempotent=False, json=self.app_configs['lottery']['lottery_data'])
             res.raise_for_status()
-            res_json = res.json()
+            res_json = json_utils.response_json(res)
             
             if res_json['code'] != '0000':
                 logger.warning(f"签到失败: {res_json.get('message', '未知错误')}")
@@ -328,59 +512,113 @@ class longzhu_lottery(longzhu):
             load_send(APP, f"签到请求异常: {str(e)}")
             return 0
     
-    def lottery_click(self) -> bool:
+    def lottery_click(self) -> dict:
         """执行抽奖
         
         Returns:
-            bool: 抽奖是否成功
+            dict: 抽奖结果，包含 success、code、message 和 prize 字段
         """
         url = 'https://gw2c-hw-open.longfor.com/llt-gateway-prod/api/v1/activity/auth/lottery/click'
+        result = {'success': False, 'code': None, 'message': '', 'prize': None}
         
         try:
-            res = self.session.post(url, json=self.app_configs['lottery']['lottery_data'], verify=False)
+            # 抽奖请求由所有账号共享的自适应控制器控制节奏，不经过按主机限速器
+            res = self._request('POST', url, rate_limited=False, idempotent=False,
+                                json=self.app_configs['lottery']['lottery_data'])
             res.raise_for_status()
-            res_json = res.json()
+            res_json = json_utils.response_json(res)
+            result['code'] = res_json['code']
             
             if res_json['code'] != '0000':
-                logger.warning(f"抽奖失败: {res_json.get('message', '未知错误')}")
-                load_send(APP, res_json.get('message', '抽奖失败'))
-                return False
+                result['message'] = res_json.get('message', '抽奖失败')
+                logger.warning(f"抽奖失败: {result['message']}")
+                return result
                 
+            result['success'] = True
+            result['prize'] = res_json['data']
             logger.info(f"抽奖成功: {res_json['data']}")
-            return True
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"抽奖请求异常: {str(e)}")
-            load_send(APP, f"抽奖请求异常: {str(e)}")
-            return False
+            result['message'] = f"抽奖请求异常: {str(e)}"
+            logger.error(result['message'])
+        return result
     
     def main(self) -> bool:
         """主执行方法
         
+        签到获取抽奖机会后，用完所有抽奖机会。抽奖节奏由自适应控制器根据服务端响应调整，
+        连续失败达到 lottery.max_failures 次（默认2次）后停止。
+        
         Returns:
-            bool: 是否成功执行签到和抽奖
+            bool: 是否成功执行签到并至少抽奖一次
         """
         try:
-            if self.lottery_sign() > 0:
-                time.sleep(1)  # 避免请求过于频繁
-                return self.lottery_click()
-            return False
+            chances = self.lottery_sign()
+            max_failures = self.app_configs['lottery'].get('max_failures', 2)
+            draws, failures, last_error = 0, 0, ''
+            while draws < chances and failures < max_failures:
+                self.lottery_controller.wait()
+                result = self.lottery_click()
+                if result['success']:
+                    self.lottery_controller.on_success()
+                    draws += 1
+                    failures = 0
+                else:
+                    self.lottery_controller.on_backoff()
+                    failures += 1
+                    last_error = result['message']
+            if chances:
+                logger.info(f"抽奖完成，抽奖机会 {chances} 次，成功 {draws} 次")
+            if failures >= max_failures:
+                load_send(APP, last_error)
+            return draws > 0
         except Exception as e:
             logger.error(f"抽奖主流程异常: {str(e)}")
             return False
 
-if __name__ == "__main__":
+@register_plugin
+class LongzhuPlugin(ScriptPlugin):
+    """龙珠插件"""
 
-    accounts = get_user_infos(APP)
-    app_configs = get_app_configs(APP)
-    if not accounts:
-        logger.error("未找到有效的账户配置信息")
-        exit(1)
+    name = APP
+
+    def account_label(self, account):
+        return str(account.get('name', account['token'][-6:]))
+
+    def run(self) -> bool:
+        # 限速器和抽奖节奏控制器为所有账号共享，在分派账号之前按配置设置一次
+        app_configs = self.app_configs()
+        if app_configs:
+            # request_interval 小于等于0时不为这些主机单独限速
+            interval = float(app_configs.get('request_interval', 2))
+            rate = 1 / interval if interval > 0 else None
+            for host in longzhu.HOSTS:
+                get_rate_limiter().set_default_limit(host, rate=rate, burst=1)
+            clock_concurrency = int(app_configs.get('sign_in', {}).get('concurrency', 2))
+            get_rate_limiter().set_default_limit(longzhu.CLOCK_LIMIT_KEY, rate=rate, burst=max(1, clock_concurrency))
+            answer_concurrency = int(app_configs.get('question', {}).get('answer_concurrency', 3))
+            get_rate_limiter().set_default_limit(longzhu.ANSWER_LIMIT_KEY, rate=rate, burst=max(1, answer_concurrency))
+            longzhu_lottery.lottery_controller = AdaptiveRateController(
+                min_delay=app_configs.get('lottery', {}).get('min_interval', 0.5))
+        return super().run()
 
-    for account in accounts:
-        # 暂时无法支持多个ID，会出现滑块验证
-        longzhu(account, app_configs).signin() 
-        time.sleep(2)
-        longzhu_lottery(account, app_configs).main()
-        time.sleep(2)
-        longzhu_question(account, app_configs).main()
\ No newline at end of file
+    def run_account(self, account, app_configs):
+        # 各流程之间的请求间隔由按主机限速器控制
+        with requests.Session() as session:
+            # 暂时无法支持多个ID，会出现滑块验证
+            longzhu(account, app_configs, session).signin() 
+            longzhu_lottery(account, app_configs, session).main()
+            longzhu_question(account, app_configs, session).main()
+
+def main() -> bool:
+    """执行所有账号的签到、抽奖和答题任务。
+
+    Returns:
+        bool: 是否找到有效的账户配置信息
+    """
+    return LongzhuPlugin().run()
+
+if __name__ == "__main__":
+    setup_logger(APP)
+    if not main():
+        exit(1)
@@ -15,7 +15,6 @@ import json
 import requests
 from loguru import logger
 import os
-import time
 from datetime import datetime
 import hashlib
 import sys
@@ -25,8 +24,13 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from utils import json_utils
 from utils.notify_utils import load_send
-from utils.config import get_app_configs, get_user_infos
+from utils.config import get_app_configs
+from utils.plugin import ScriptPlugin, register_plugin
+from utils.http_utils import get_session
+from utils.rate_limit import get_rate_limiter
+from utils.retry import get_retry_engine
 
 APP = 'signin_type_1'
 
@@ -96,6 +100,11 @@ class AppBase:
         }
         self.login_url = f"https://{self.app_config['host']}/api/Token/WXVIPLogin"
         self.signin_url = f"https://{self.app_config['host']}/api/Sign/SignIn"
+        self.session = get_session()
+        # 同一小程序主机的请求默认至少间隔2秒，配置文件 common.rate_limit 中的设置优先
+        get_rate_limiter().set_default_limit(self.app_config['host'], rate=0.5, burst=1)
+        # 限速和重试由统一的重试引擎处理
+        self.retry_engine = get_retry_engine()
 
     def login(self, openid: str) -> str:
         """执行登录操作。
@@ -131,12 +140,12 @@ class AppBase:
         })
 
         try:
-            response = requests.post(self.login_url,
-                                   json=json_data,
-                                   headers=self.comm_headers)
+            response = self.retry_engine.request(self.session, 'POST', self.login_url,
+                                                 json=json_data,
+                                                 headers=self.comm_headers)
             response.raise_for_status()
 
-            result = response.json()
+            result = json_utils.response_json(response)
             logger.info(f"{self.app_name} 登录请求结果: {result}")
             if not result['success']:
                 load_send(self.app_name, response.text)
@@ -160,10 +169,12 @@ class AppBase:
         headers = {**self.comm_headers, **self.app_config['headers']}
 
         try:
-            response = requests.post(self.signin_url, headers=headers)
+            # 签到请求不幂等，只在确定未被服务端处理时重试
+            response = self.retry_engine.request(self.session, 'POST', self.signin_url,
+                                                 idempotent=False, headers=headers)
             response.raise_for_status()
 
-            result = response.json()
+            result = json_utils.response_json(response)
             logger.info(f"{self.app_name} 签到请求结果: {result}")
             if not result['success']:
                 # 解码错误信息中的字节字符串
@@ -184,18 +195,31 @@ class AppBase:
         """执行登录和签到操作。"""
         token = self.login(self.open_id)
         if token:
-            time.sleep(2)
             self.signin(f"Bearer {token}")  # 注意这里的 token 应该是 "Bearer {token}" 的形式
         else:
             logger.error(f"{self.app_name}: 登录失败")
 
+@register_plugin
+class SigninType1Plugin(ScriptPlugin):
+    """微信小程序自动签到插件"""
+
+    name = APP
+
+    def account_label(self, account):
+        return str(account.get('app', ''))
+
+    def run_account(self, account, app_configs):
+        AppBase(account['app'], account['openid']).main()
+
+def main() -> bool:
+    """执行所有账号的自动登录和签到流程。
+
+    Returns:
+        bool: 是否找到有效的账户配置信息
+    """
+    return SigninType1Plugin().run()
+
 if __name__ == '__main__':
     """主函数，执行自动登录和签到流程。"""
-    accounts = get_user_infos(APP)
-    if not accounts:
-        logger.error("未找到有效的账户配置信息")
+    if not main():
         exit(1)
-
-    for account in accounts:
-        AppBase(account['app'], account['openid']).main()
-        time.sleep(1)
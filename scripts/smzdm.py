@@ -9,13 +9,17 @@
 版本：1.0
 """
 # 标准库
-import base64
+import binascii
+import contextvars
 import hashlib
 import json
 import os
 import re
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # 第三方库
@@ -30,49 +34,136 @@ if project_root not in sys.path:
 
 # 本地应用/库
 from utils.notify_utils import load_send
-from utils.config import get_app_configs, get_user_infos
+from utils.log_utils import setup_logger
+from utils.plugin import ScriptPlugin, register_plugin
+from utils import json_utils
+from utils.http_utils import get_session
+from utils.rate_limit import get_rate_limiter
+from utils.retry import get_retry_engine
+from utils.state_store import TaskLedger
+from utils.text_utils import clean_html, extract_tag_text
 urllib3.disable_warnings()
 
-# 配置日志输出
-logger.remove()
-logger.add(
-    os.path.join(project_root, "logs", "smzdm_debug.log"),
-    level="DEBUG",
-    rotation="1 day",
-    retention="7 days",
-    encoding="utf-8"
-)
-logger.add(
-    sys.stdout,
-    level="DEBUG",
-    filter=lambda record: record['level'].name != "DEBUG"
-)
-
 APP = 'smzdm'
 
-def clean_html(html_string):
-    """去除字符串中HTML标签"""
-    pattern = re.compile(r'<[^>]+>')
-    return pattern.sub('', html_string).strip()
+_ATOB_PREFIX = b"atob('"
+
+
+def extract_and_decode_base64(content) -> bytes:
+    """找出响应内容中 atob('...') 单引号间的 Base64 编码字符串并解码
+
+    使用 bytes.find 定位编码内容，通过 memoryview 切片直接解码，不复制中间字符串；
+    返回的字节可直接交给 json_utils.loads 解析。
+
+    Args:
+        content (bytes | str): 响应内容，建议直接传入 response.content
+
+    Returns:
+        bytes: 解码后的字节
+
+    Raises:
+        ValueError: 未找到编码内容或解码出错时抛出
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    start = content.find(_ATOB_PREFIX)
+    while start >= 0:
+        start += len(_ATOB_PREFIX)
+        end = content.find(b"'", start)
+        if end < 0:
+            break
+        if content[end + 1:end + 2] == b')':
+            try:
+                return binascii.a2b_base64(memoryview(content)[start:end])
+            except binascii.Error as e:
+                raise ValueError(f'Base64 解码出错: {e}')
+        start = content.find(_ATOB_PREFIX, end)
+    raise ValueError('未找到 Base64 编码内容')
+
+class DiscoveryCache:
+    """同一次运行中各账号共享的活动发现结果
+
+    专题页解析出的活动/抽奖ID、抽奖活动信息与账号无关，第一个需要的账号请求并缓存，
+    其余账号直接使用。同一个键同时只有一个线程加载；加载抛出异常或结果无效（默认为空值）时不缓存，
+    由下一个账号重新加载。
+    """
+
+    def __init__(self):
+        self._results = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, loader, valid=bool):
+        """获取缓存结果，不存在时调用 loader 加载
+
+        Args:
+            key: 缓存键
+            loader (callable): 无参数的加载函数
+            valid (callable, optional): 判断加载结果是否有效的函数，只缓存有效的结果，默认为 bool
+
+        Returns:
+            loader 的返回值
+        """
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key in self._results:
+                return self._results[key]
+            result = loader()
+            if valid(result):
+                self._results[key] = result
+            return result
+
+
+class RequestSigner:
+    """什么值得买接口签名器
+
+    签名规则：将所有参数按键名排序后拼接为 `k1=v1&k2=v2...&key=<密钥>`，取MD5的大写十六进制。
+    每个接口的固定参数在初始化时排序并拼接好，签名时只需将少量动态参数归并进去，
+    一次遍历同时得到表单数据和查询字符串。
+    """
+
+    def __init__(self, key: str, params: dict, endpoints: dict):
+        """初始化签名器
+
+        Args:
+            key (str): 签名密钥
+            params (dict): 各接口共用的固定参数取值
+            endpoints (dict): 接口表，{名称: (URL, 固定参数名元组, 额外固定参数字典)}
+        """
+        self.key = key
+        self._endpoints = {}
+        for name, (url, fields, extra) in endpoints.items():
+            static = {**{field: params[field] for field in fields}, **extra}
+            prefix = sorted((k, f"{k}={v}") for k, v in static.items())
+            self._endpoints[name] = (url, static, prefix)
+
+    def url(self, name: str) -> str:
+        """获取接口URL"""
+        return self._endpoints[name][0]
+
+    def build(self, name: str, **dynamic) -> tuple:
+        """生成带签名的请求参数
+
+        Args:
+            name (str): 接口名称
+            **dynamic: 动态参数，与固定参数同名时覆盖固定参数；未传入time时使用当前毫秒时间戳
+
+        Returns:
+            tuple: (表单数据字典, 查询字符串)，两者均包含签名(sign)
+        """
+        _, static, prefix = self._endpoints[name]
+        dynamic.setdefault('time', int(round(time.time() * 1000)))
+        if not dynamic.keys().isdisjoint(static):
+            prefix = [item for item in prefix if item[0] not in dynamic]
+        # 固定参数已是有序序列，追加动态参数后排序只需归并少量元素
+        items = prefix + [(k, f"{k}={v}") for k, v in dynamic.items()]
+        items.sort()
+        joined = "&".join([segment for _, segment in items])
+        sign = hashlib.md5(f"{joined}&key={self.key}".encode("utf-8")).hexdigest().upper()
+        data = {**static, **dynamic, "sign": sign}
+        return data, f"{joined}&sign={sign}"
 
-def extract_and_decode_base64(input_str):
-    """利用正则表达式找出单引号间的 Base64 编码字符串"""
-    match = re.search(r"atob\('([^']*)'\)", input_str)
-    if not match:
-        raise ValueError('未找到 Base64 编码内容')
-    
-    encoded_data = match.group(1)  # 获取捕获的编码字符串
-    
-    try:
-        # 执行 Base64 解码操作
-        decoded_bytes = base64.b64decode(encoded_data)
-        # 尝试以 UTF-8 编码将字节转换为字符串
-        return decoded_bytes.decode('utf-8')
-    except UnicodeDecodeError:
-        # 若 UTF-8 解码失败，则返回原始字节数据的十六进制表示
-        return decoded_bytes.hex()
-    except base64.binascii.Error as e:
-        raise ValueError(f'Base64 解码出错: {e}')
 
 class SMZDM():
     """什么值得买"""
@@ -84,17 +175,42 @@ class SMZDM():
     # 常量定义
     TIMEOUT = 20
     MAX_RETRIES = 3
-    RETRY_DELAY = 2
     app_ver = '10.4.1'
     is_wx = '1'
     device = 'android'
     key = 'apr1$AwP!wRRT$gJ/q.X24poeBInlUJC'
     sk = 'ierkM0OZZbsuBKLoAgQ6OJneLMXBQXmzX+LXkNTuKch8Ui2jGlahuFyWIzBiDq/L' 
+    # 签名接口表：{名称: (URL, 固定参数名, 额外固定参数)}，动态参数（time、token、任务ID等）在请求时传入
+    COMMON_FIELDS = ('basic_v', 'f', 'v', 'weixin', 'zhuanzai_ab')
+    ENDPOINTS = {
+        'robot_token': ('https://user-api.smzdm.com/robot/token', COMMON_FIELDS, {}),
+        'checkin': ('https://user-api.smzdm.com/checkin', ('f', 'v', 'sk', 'weixin'), {}),
+        'all_reward': ('https://user-api.smzdm.com/checkin/all_reward', (), {}),
+        'show_view': ('https://user-api.smzdm.com/checkin/show_view_v2', COMMON_FIELDS, {}),
+        'extra_reward': ('https://user-api.smzdm.com/checkin/extra_reward', COMMON_FIELDS, {}),
+        'event_view_article_sync': ('https://user-api.smzdm.com/task/event_view_article_sync', ('f', 'v', 'weixin'), {}),
+        'activity_task_receive': ('https://user-api.smzdm.com/task/activity_task_receive', ('f', 'v', 'weixin'), {}),
+        'activity_receive': ('https://user-api.smzdm.com/task/activity_receive', COMMON_FIELDS, {}),
+        'task_list': ('https://user-api.smzdm.com/task/list_v2', COMMON_FIELDS, {}),
+        'rank_list': ('https://haojia-api.smzdm.com/ranking_list/articles', COMMON_FIELDS,
+                      {'channel_id': 0, 'exclude_article_ids': 'null', 'sub_tab': 0, 'tab': 1}),
+    }
+    signer = RequestSigner(key, {'basic_v': 0, 'f': device, 'v': app_ver, 'sk': sk, 'weixin': is_wx,
+                                 'zhuanzai_ab': 'b'}, ENDPOINTS)
     headers = {
         "Host": "user-api.smzdm.com",
         "Content-Type": "application/x-www-form-urlencoded",
         "User-Agent": "smzdm_android_V10.4.1 rv:841 (22021211RC;Android12;zh)smzdmapp",
     }
+    # 各主机的默认限速（每秒请求数, 突发请求数），配置文件 common.rate_limit 中的设置优先
+    RATE_LIMITS = {
+        'user-api.smzdm.com': (1, 3),
+        'zhiyou.smzdm.com': (0.5, 1),
+        'zhiyou.m.smzdm.com': (1, 2),
+        'm.smzdm.com': (1, 2),
+        'post.m.smzdm.com': (1, 2),
+        'haojia-api.smzdm.com': (1, 2),
+    }
     zhiyou_headers = {
         "origin": "https://m.smzdm.com",
         "x-requested-with": "com.smzdm.client.android",
@@ -104,121 +220,85 @@ class SMZDM():
         "Accept-Encoding": "gzip, deflate, br",
     }
 
-    def __init__(self, cookie: str):
-        self.cookie = cookie
-        self.headers['Cookie'] = self.cookie
-        self.zhiyou_headers['Cookie'] = self.cookie
+    def __init__(self, cookie: str, account: str = None, resume: bool = True, discovery: DiscoveryCache = None):
+        """初始化
 
-    def _request_with_retry(self, method: str, url: str, headers: dict, data: dict = None) -> requests.Response:
+        Args:
+            cookie (str): 账号Cookie
+            account (str, optional): 账号名称，用于区分本地任务台账，默认使用Cookie
+            resume (bool, optional): 是否跳过今天已完成的步骤（断点续跑），默认为True
+            discovery (DiscoveryCache, optional): 多个账号共享的活动发现结果，默认只在本账号内使用
+        """
+        self.cookie = cookie
+        # 复制类属性中的请求头，避免多个账号实例之间共享同一个字典
+        self.headers = {**self.headers, 'Cookie': self.cookie}
+        self.zhiyou_headers = {**self.zhiyou_headers, 'Cookie': self.cookie}
+        self.session = get_session()
+        self.retry_engine = get_retry_engine()
+        # 签到页面快照（show_view_v2 和 task/list_v2 的结果），同一账号的一次运行内只请求一次，
+        # 发送非幂等请求（签到、领取奖励等）后失效
+        self._page_snapshot = {}
+        # 当天的任务进度台账，重新运行时跳过已完成的任务
+        self.ledger = TaskLedger(APP, account or cookie)
+        self.resume = resume
+        self.discovery = discovery or DiscoveryCache()
+        for host, (rate, burst) in self.RATE_LIMITS.items():
+            get_rate_limiter().set_default_limit(host, rate, burst)
+
+    def _request_with_retry(self, method: str, url: str, headers: dict, data: dict = None,
+                            idempotent: bool = True) -> requests.Response:
         """发送HTTP请求并处理重试逻辑
         
         该方法封装了HTTP请求的发送和重试逻辑，支持GET和POST方法。
-        当请求失败时，会自动重试，直到达到最大重试次数。
+        重试由统一的重试引擎（utils.retry）处理：指数退避加随机抖动、
+        Retry-After、单次运行的重试预算和按主机的熔断器。
         
         Args:
             method (str): HTTP方法，"get"或"post"
             url (str): 请求URL
             headers (dict): 请求头
             data (dict, optional): 请求数据，默认为None
+            idempotent (bool, optional): 请求是否幂等，签到、抽奖、领取奖励等请求应传入False，
+                避免在请求可能已被处理时重放，同时使签到页面快照失效
             
         Returns:
             requests.Response: 请求响应对象
             
         Raises:
             requests.RequestException: 当请求失败且重试次数用尽时抛出
-            ValueError: 当响应内容无法解析时抛出
+            ValueError: 当HTTP方法不受支持时抛出
         """
         method = method.lower()
         if method not in ["get", "post"]:
             raise ValueError(f"不支持的HTTP方法: {method}")
-            
-        for i in range(self.MAX_RETRIES):
-            try:
-                if method == "post":
-                    response = requests.post(url=url, headers=headers, data=data, timeout=self.TIMEOUT, verify=False)
-                else:
-                    response = requests.get(url=url, headers=headers, timeout=self.TIMEOUT, verify=False)
-                
-                response.raise_for_status()
-                return response
-            except requests.HTTPError as e:
-                status_code = e.response.status_code if hasattr(e, 'response') else 'unknown'
-                logger.warning(f"HTTP错误 (尝试 {i+1}/{self.MAX_RETRIES}): {url} - 状态码: {status_code}")
-            except requests.ConnectionError:
-                logger.warning(f"连接错误 (尝试 {i+1}/{self.MAX_RETRIES}): {url}")
-            except requests.Timeout:
-                logger.warning(f"请求超时 (尝试 {i+1}/{self.MAX_RETRIES}): {url}")
-            except (requests.RequestException, ValueError) as e:
-                logger.warning(f"请求失败 (尝试 {i+1}/{self.MAX_RETRIES}): {url} - {str(e)}")
-            
-            if i == self.MAX_RETRIES - 1:
-                logger.error(f"请求失败，已达到最大重试次数: {url}")
-                raise
-            
-            # 指数退避策略，每次重试等待时间增加
-            wait_time = self.RETRY_DELAY * (2 ** i)
-            logger.debug(f"等待 {wait_time} 秒后重试...")
-            time.sleep(wait_time)
-
-    def _generate_signed_post_data(self, data: dict) -> dict:
-        """生成带签名的提交数据
-        
-        该方法用于生成带有签名的POST数据，用于各种API请求。
-        签名算法基于MD5哈希，使用时间戳、随机字符串和密钥组合生成。
-        
-        Args:
-            data (dict): 原始数据字典，包含请求所需的参数
-            
-        Returns:
-            dict: 添加签名(sign)、时间戳(time)和随机字符串(sign_key)后的数据字典
-        
-        Note:
-            此方法被多个API请求方法调用，如签到、任务完成、抽奖等
-        """
-        # 构建签名字符串
-        sign_str = "&".join([f"{k}={v}" for k, v in sorted(data.items())])
-        sign_str += f"&key={self.key}"
-        
-        # 计算签名
-        sign = hashlib.md5(bytes(sign_str, encoding="utf-8")).hexdigest().upper()
-        data["sign"] = sign
-        
-        return data
+        if not idempotent:
+            # 请求失败时服务端也可能已经处理，因此在发送前就让签到页面快照失效
+            self._page_snapshot.clear()
+        
+        try:
+            response = self.retry_engine.request(
+                self.session, method.upper(), url, idempotent=idempotent,
+                max_attempts=self.MAX_RETRIES, headers=headers,
+                data=data if method == "post" else None, timeout=self.TIMEOUT, verify=False
+            )
+            response.raise_for_status()
+            return response
+        except requests.RequestException as e:
+            logger.error(f"请求失败: {url} - {str(e)}")
+            raise
 
     def _robot_token(self, headers):
         '''获取token'''
-        url = 'https://user-api.smzdm.com/robot/token'
-        ts = int(round(time.time() * 1000))
-        data = {
-            "basic_v": 0,
-            "f": self.device,
-            "v": self.app_ver,
-            "time": ts,
-            "weixin": self.is_wx,
-            "zhuanzai_ab": "b"
-        }
-
-        data = self._generate_signed_post_data(data)
-        response = self._request_with_retry("post", url, headers, data)
-        result = response.json()
+        data, _ = self.signer.build('robot_token')
+        response = self._request_with_retry("post", self.signer.url('robot_token'), headers, data)
+        result = json_utils.response_json(response)
         return result["data"]["token"]
 
     def _sign(self, headers, token):
         '''签到'''
-        timestamp = int(round(time.time() * 1000))
-        data = {
-            "f": self.device,
-            "v": self.app_ver,
-            "sk": self.sk,
-            "weixin": self.is_wx,
-            "time": timestamp,
-            "token": token
-        }
-        
-        data = self._generate_signed_post_data(data)
-        url = "https://user-api.smzdm.com/checkin"
-        response = self._request_with_retry("post", url, headers, data)
-        ret = response.json()
+        data, _ = self.signer.build('checkin', token=token)
+        response = self._request_with_retry("post", self.signer.url('checkin'), headers, data, idempotent=False)
+        ret = json_utils.response_json(response)
         msg = [
             {"name": "签到结果", "value": ret["error_msg"]},
             {"name": "补签卡", "value": ret['data']['cards']},
@@ -229,9 +309,9 @@ class SMZDM():
 
     def _all_reward(self, headers, data):
         '''获取奖励结果'''
-        url2 = "https://user-api.smzdm.com/checkin/all_reward"
-        response = self._request_with_retry("post", url2, headers, data)
-        result = response.json()
+        # 使用签到请求的签名数据
+        response = self._request_with_retry("post", self.signer.url('all_reward'), headers, data)
+        result = json_utils.response_json(response)
         msgs = []
         if result['error_code'] == '0':
             normal_reward = result["data"]["normal_reward"]
@@ -252,8 +332,28 @@ class SMZDM():
             ]
         return msgs
 
+    def _step_done(self, step: str) -> bool:
+        """判断步骤今天是否已完成，断点续跑时跳过已完成的步骤
+
+        Args:
+            step (str): 步骤名称，如 sign、activity:<活动ID>、lottery:<抽奖ID>
+
+        Returns:
+            bool: 需要跳过时返回True
+        """
+        if self.resume and self.ledger.is_done(f'step:{step}'):
+            logger.info(f'步骤 {step} 今日已完成，跳过。')
+            return True
+        return False
+
+    def _finish_step(self, step: str) -> None:
+        """在本地台账中记录步骤已完成"""
+        self.ledger.mark_done(f'step:{step}')
+
     def sign_main(self):
         '''签到和连续签到奖励'''
+        if self._step_done('sign'):
+            return
         token = self._robot_token(self.headers)
         msg, data = self._sign(self.headers, token)
         extra_reward = self._get_extra_reward()
@@ -262,43 +362,25 @@ class SMZDM():
         msg += reward_msg
         msg = "\n".join([f"{one.get('name')}: {one.get('value')}" for one in msg])
         logger.info(msg)
+        self._finish_step('sign')
 
     def _event_view_article_sync(self, task, headers):
-        ts = int(round(time.time() * 1000))
-        url = 'https://user-api.smzdm.com/task/event_view_article_sync'
-        data = {
-            "article_id": task["article_id"],
-            "f": self.device,
-            "v": self.app_ver,
-            "weixin": self.is_wx,
-            "time": ts,
-            "task_id": task["task_id"],
-            "channel_id": task["channel_id"]
-        }
-        
-        data = self._generate_signed_post_data(data)
-
-        response = self._request_with_retry("post", url, headers, data).json()
+        data, _ = self.signer.build('event_view_article_sync', article_id=task["article_id"],
+                                    task_id=task["task_id"], channel_id=task["channel_id"])
+        response = json_utils.response_json(
+            self._request_with_retry("post", self.signer.url('event_view_article_sync'), headers, data))
         logger.debug(response)
         
     def _activity_task_receive(self, task_id, robot_token, headers):
-        ts = int(round(time.time() * 1000))
-        url = 'https://user-api.smzdm.com/task/activity_task_receive'
-        data = {
-            "f": self.device,
-            "v": self.app_ver,
-            "weixin": self.is_wx,
-            "time": ts,
-            "task_id": task_id,
-            "robot_token": robot_token
-        }
-        
-        data = self._generate_signed_post_data(data)
-
-        response = self._request_with_retry("post", url, headers, data).json()
+        data, _ = self.signer.build('activity_task_receive', task_id=task_id, robot_token=robot_token)
+        response = json_utils.response_json(self._request_with_retry(
+            "post", self.signer.url('activity_task_receive'), headers, data, idempotent=False))
         logger.debug(response)
         if int(response['error_code']) == 0:
             logger.info(clean_html(response['data']['reward_msg']))
+            return True
+        logger.error(f"领取任务奖励失败({task_id}): {response.get('error_msg')}")
+        return False
     
     def _get_activity_task_list(self, activity_id):
         '''获取指定活动的任务列表
@@ -312,7 +394,7 @@ class SMZDM():
             tuple: (活动名称, 开始时间, 结束时间, 任务列表), 如果请求失败则返回(None, None, None, [])
         '''
         url = f'https://zhiyou.m.smzdm.com/task/task/ajax_get_activity_info?activity_id={activity_id}'
-        response = self._request_with_retry("get", url, self.zhiyou_headers).json()
+        response = json_utils.response_json(self._request_with_retry("get", url, self.zhiyou_headers))
         
         if response["error_code"] == 0:
             ret_data = response.get('data', '')
@@ -334,7 +416,7 @@ class SMZDM():
             activity_id_list (list): 活动ID列表
 
         Returns:
-            None
+            bool: 所有活动的任务是否都已处理完毕
             
         Note:
             1. 通过活动ID获取活动任务列表
@@ -344,91 +426,108 @@ class SMZDM():
         if activity_id_list is None:
             activity_id_list = self.activity_list
             
+        all_finished = True
         for activity_id in activity_id_list:
+            if self._step_done(f'activity:{activity_id}'):
+                continue
             activity_name, start_date, end_date, task_list = self._get_activity_task_list(activity_id)
             
             if not activity_name:
+                all_finished = False
                 continue
                 
             if end_date >= datetime.now():
                 logger.info(f'开始 活动任务{activity_name}({activity_id})。')
-                for task in task_list:
-                    self._process_task(task)
+                finished = [self._process_task(task) for task in task_list]
+                if not all(finished):
+                    all_finished = False
+                    continue
             else:
                 logger.info(f'活动任务{activity_name}({activity_id})已结束。')
+            self._finish_step(f'activity:{activity_id}')
+        return all_finished
         
-    def _process_task(self, task: json):
+    def _process_task(self, task: json) -> bool:
         """处理并完成单个任务
         
-        根据任务类型执行不同的操作，如浏览文章、同步任务状态、领取奖励等
+        根据任务类型执行不同的操作，如浏览文章、同步任务状态、领取奖励等。
+        任务进度记录在本地台账中：已完成的任务不再发送请求；浏览已开始但未领取奖励时
+        （如上次运行中断），只补足剩余的浏览时长后直接领取。resume 为False时忽略台账中的进度，重新执行。
         
         Args:
             task (json): 任务信息，包含任务ID、名称、类型、状态等
             
         Returns:
-            None
+            bool: 任务是否已处理完毕（已完成或脚本无法完成的类型）
         """
+        task_key = f'task:{task["task_id"]}'
+        if self.resume and self.ledger.is_done(task_key):
+            logger.debug(f'Task {task["task_name"]}({task["task_id"]}) 今日已完成，跳过。')
+            return True
+
         if task["task_event_type"] == "interactive.view.article" and int(task["task_status"]) != 4:
             # 浏览文章任务
             logger.info(f'Do {task["task_name"]} {task["task_button_text"] if "task_button_text" in task else ""}({task["task_id"]}):')
             
-            pretty = json.dumps(task, ensure_ascii=False, indent=2)
+            pretty = json_utils.dumps(task, indent=True)
             logger.debug(pretty)
 
             # 根据task_even_num循环执行任务
+            all_received = True
             for _ in range(int(task['task_even_num']) - int(task['task_finished_num'])):
                 # 获取token
                 token = self._robot_token(self.headers)
-                time.sleep(1)
-                # 同步开始信息
-                self._event_view_article_sync(task, self.headers)
-                time.sleep(11)
+                synced_at = self.ledger.get(f'{task_key}:synced_at') if self.resume else None
+                if synced_at is None:
+                    # 同步开始信息
+                    self._event_view_article_sync(task, self.headers)
+                    synced_at = time.time()
+                    self.ledger.set(f'{task_key}:synced_at', synced_at)
+                else:
+                    logger.info(f'继续上次中断的浏览任务({task["task_id"]})')
+                # 等待文章浏览时长，其余请求间隔由限速器控制
+                remaining = 11 - (time.time() - synced_at)
+                if remaining > 0:
+                    time.sleep(remaining)
                 # 完成任务
-                self._activity_task_receive(task["task_id"], token, self.headers)
-                time.sleep(2)
-        else:
-            logger.debug(
-                f'Task {task["task_name"]}({task["task_id"]}) 任务 '
-                f'{"已完成" if task["task_status"] == 4 else "类型" + task["task_event_type"] + "我做不来"}。'
-            )
+                received = self._activity_task_receive(task["task_id"], token, self.headers)
+                self.ledger.set(f'{task_key}:synced_at', None)
+                if received:
+                    self.ledger.increment(f'{task_key}:views')
+                all_received = all_received and received
+            if all_received:
+                self.ledger.mark_done(task_key)
+            return all_received
+
+        if int(task["task_status"]) == 4:
+            self.ledger.mark_done(task_key)
+        logger.debug(
+            f'Task {task["task_name"]}({task["task_id"]}) 任务 '
+            f'{"已完成" if int(task["task_status"]) == 4 else "类型" + task["task_event_type"] + "我做不来"}。'
+        )
+        return True
         
     def _show_view(self):
-        ts = int(round(time.time() * 1000))
-        url = 'https://user-api.smzdm.com/checkin/show_view_v2'
-        data = {
-            "zhuanzai_ab": "b",
-            "weixin": self.is_wx,
-            "f": self.device,
-            "v": self.app_ver,
-            "time": ts, 
-            "basic_v": 0
-        }
-        
-        data = self._generate_signed_post_data(data)
-        
-        response = self._request_with_retry("post", url, self.headers, data)
+        """获取签到页面数据，结果缓存在签到页面快照中"""
+        if 'show_view' in self._page_snapshot:
+            return self._page_snapshot['show_view']
+        data, _ = self.signer.build('show_view')
+        response = self._request_with_retry("post", self.signer.url('show_view'), self.headers, data)
         if response.status_code == 200:
-            return response.json()
+            ret = json_utils.response_json(response)
+            if int(ret['error_code']) == 0:
+                self._page_snapshot['show_view'] = ret
+            return ret
         
         raise Exception(f'返回错误：{response.text}')
     
     def _extra_reward(self):
-        ts = int(round(time.time() * 1000))
-        url = 'https://user-api.smzdm.com/checkin/extra_reward'
-        data = {
-            "basic_v": 0,
-            "f": self.device,
-            "v": self.app_ver,
-            "weixin": self.is_wx,
-            "time": ts,
-            "zhuanzai_ab": "b"
-        }
-        
-        data = self._generate_signed_post_data(data)
-        response = self._request_with_retry("post", url, self.headers, data)
+        data, _ = self.signer.build('extra_reward')
+        response = self._request_with_retry("post", self.signer.url('extra_reward'), self.headers, data,
+                                            idempotent=False)
         
         if response.status_code == 200:
-            return response.json()
+            return json_utils.response_json(response)
         
         raise Exception(f'返回错误：{response.text}')
 
@@ -463,8 +562,7 @@ class SMZDM():
                 # 如果需要获取连续签到的额外奖励
                 ret_reward = self._extra_reward()
                 if int(ret_reward['error_code']) == 0:
-                    pattern = r'>([^<]+)<'  # 匹配>和<之间的非<字符
-                    result = ''.join(re.findall(pattern, ret_reward['data']['gift']['content']))
+                    result = extract_tag_text(ret_reward['data']['gift']['content'])
                     return result  # 输出: 经验+10                
                 else:
                     return ret_reward['error_msg']
@@ -476,64 +574,117 @@ class SMZDM():
 
     def _get_activity_receive(self, activity_id):
         '''获取任务阶段奖励'''
-        url = 'https://user-api.smzdm.com/task/activity_receive'
-        ts = int(round(time.time() * 1000))
-        data = {
-            "basic_v": 0,
-            "f": self.device,
-            "v": self.app_ver,
-            "weixin": self.is_wx,
-            "activity_id": activity_id,
-            "time": ts,
-            "zhuanzai_ab": "b",
-        }
-
-        data = self._generate_signed_post_data(data)
-        
-        response = self._request_with_retry("post", url, self.headers, data).json()
+        data, _ = self.signer.build('activity_receive', activity_id=activity_id)
+        response = json_utils.response_json(self._request_with_retry(
+            "post", self.signer.url('activity_receive'), self.headers, data, idempotent=False))
         logger.debug(response)
         if int(response['error_code']) == 0:
             return clean_html(response['data']['reward_msg'])
         return response['error_msg']
 
-    def _get_rank_list(self):
-        '''获取排行榜文章列表'''
-        headers = {
+    RANK_PAGE_SIZE = 20
+    # 排行榜中的非文章卡片类型
+    RANK_SKIP_CELL_TYPES = ('21017',)
+    # 翻页时通过 exclude_article_ids 排除的最近文章数，避免排行变化导致重复
+    RANK_EXCLUDE_WINDOW = 100
+
+    def _rank_headers(self):
+        """排行榜接口使用安卓客户端的请求头"""
+        return {
             "accept-encoding": "gzip",
             "Cookie": self.cookie,
             "User-Agent": "smzdm_android_V10.4.1 rv:841 (22021211RC;Android12;zh)smzdmapp",
         }
-        ts = int(round(time.time() * 1000))
-        url = 'https://haojia-api.smzdm.com/ranking_list/articles'
-        params = {
-            "basic_v": 0,
-            "channel_id": 0,
-            "exclude_article_ids": "null",
-            "f": "android",
-            "limit": 20,
-            "offset": 0,
-            "sub_tab": 0,
-            "tab": 1,
-            "time": ts,
-            "v": self.app_ver,
-            "weixin": self.is_wx,
-            "zhuanzai_ab": "b"
-        }
-        
-        params = self._generate_signed_post_data(params)
-        
-        # 构建完整的URL参数字符串
-        query_string = "&".join([f"{k}={v}" for k, v in params.items()])
 
-        response = self._request_with_retry("get", f"{url}?{query_string}", headers)
-        
-        if response.status_code == 200:
-            ret = response.json()
-            if int(ret['error_code']) == 0:
-                for article in ret['data']['rows']:
-                    if article['cell_type'] != '21017':
-                        logger.info(f'{article["article_title"]} {article["article_price"]}:值{article.get("article_worthy", 0)}/不值{article.get("article_unworthy",0)} 评论{article.get("article_comment",0)}')
-        # logger.debug(response.text)
+    def _fetch_rank_page(self, offset, exclude_ids):
+        """获取一页排行榜文章
+
+        Args:
+            offset (int): 起始位置
+            exclude_ids (list): 需要排除的文章ID
+
+        Returns:
+            list: 文章列表，请求失败或没有更多文章时返回空列表
+        """
+        _, query_string = self.signer.build(
+            'rank_list', limit=self.RANK_PAGE_SIZE, offset=offset,
+            exclude_article_ids=",".join(exclude_ids) if exclude_ids else "null"
+        )
+        response = self._request_with_retry("get", f"{self.signer.url('rank_list')}?{query_string}",
+                                            self._rank_headers())
+        ret = json_utils.response_json(response)
+        if int(ret['error_code']) != 0:
+            logger.error(f"获取排行榜失败(offset={offset}): {ret.get('error_msg')}")
+            return []
+        return ret['data'].get('rows') or []
+
+    def iter_rank_pages(self, max_articles=None, prefetch=True):
+        """逐页获取排行榜的生成器，每次产出一次请求取得的一页文章
+
+        按需翻页，处理当前页时在后台预取下一页；只保留最近的文章ID用于去重和排除，
+        扫描大量文章时内存占用固定。
+
+        Args:
+            max_articles (int, optional): 最多获取的文章数，默认不限制，直到没有更多文章
+            prefetch (bool, optional): 是否在后台预取下一页
+
+        Yields:
+            list: 一页中去重并去掉广告等非文章内容后的文章，可能为空列表
+        """
+        recent_ids = deque(maxlen=self.RANK_EXCLUDE_WINDOW)
+        offset = 0
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='rank-prefetch') as executor:
+            pending = None
+            while max_articles is None or offset < max_articles:
+                rows = pending.result() if pending else self._fetch_rank_page(offset, list(recent_ids))
+                pending = None
+                if not rows:
+                    return
+                # 去掉翻页期间因排行变化重复出现的文章
+                fresh = []
+                for article in rows:
+                    article_id = str(article.get('article_id', ''))
+                    if article_id:
+                        if article_id in recent_ids:
+                            continue
+                        recent_ids.append(article_id)
+                    if article.get('cell_type') not in self.RANK_SKIP_CELL_TYPES:
+                        fresh.append(article)
+                offset += len(rows)
+                more = len(rows) >= self.RANK_PAGE_SIZE and (max_articles is None or offset < max_articles)
+                if more and prefetch:
+                    # 预取线程沿用当前上下文（本次运行的重试预算）
+                    pending = executor.submit(contextvars.copy_context().run, self._fetch_rank_page,
+                                              offset, list(recent_ids))
+
+                yield fresh
+                if not more:
+                    return
+
+    def iter_rank_list(self, max_articles=None, min_worthy=0, max_unworthy=None, prefetch=True):
+        """逐篇获取排行榜文章的生成器
+
+        Args:
+            max_articles (int, optional): 最多获取的文章数（过滤前），默认不限制，直到没有更多文章
+            min_worthy (int, optional): "值"的最低票数
+            max_unworthy (int, optional): "不值"的最高票数，默认不限制
+            prefetch (bool, optional): 是否在后台预取下一页
+
+        Yields:
+            dict: 满足条件的文章
+        """
+        for page in self.iter_rank_pages(max_articles, prefetch):
+            for article in page:
+                if int(article.get('article_worthy', 0) or 0) < min_worthy:
+                    continue
+                if max_unworthy is not None and int(article.get('article_unworthy', 0) or 0) > max_unworthy:
+                    continue
+                yield article
+
+    def _get_rank_list(self):
+        '''获取排行榜文章列表'''
+        for article in self.iter_rank_list(max_articles=self.RANK_PAGE_SIZE, prefetch=False):
+            logger.info(f'{article["article_title"]} {article["article_price"]}:值{article.get("article_worthy", 0)}/不值{article.get("article_unworthy",0)} 评论{article.get("article_comment",0)}')
 
     def _get_task_list(self):
         """获取签到页面的任务
@@ -544,36 +695,33 @@ class SMZDM():
             list: 包含任务详细信息的列表，如果请求失败则返回空列表
             
         Note:
-            该方法使用_generate_signed_post_data生成签名数据
+            成功获取的结果缓存在签到页面快照中
         """
-        url = 'https://user-api.smzdm.com/task/list_v2'
-        ts = int(round(time.time() * 1000))
-        data = {
-            "basic_v": 0,
-            "f": self.device,
-            "time": ts,
-            "v": self.app_ver,
-            "weixin": self.is_wx,
-            "zhuanzai_ab": "b"
-        }
-
-        data = self._generate_signed_post_data(data)
-
-        response = self._request_with_retry("post", url, self.headers, data)
+        if 'task_list' in self._page_snapshot:
+            return self._page_snapshot['task_list']
+        data, _ = self.signer.build('task_list')
+        response = self._request_with_retry("post", self.signer.url('task_list'), self.headers, data)
         
         task_list = []
         
         if response.status_code == 200:
-            ret = response.json()
+            ret = json_utils.response_json(response)
             if int(ret['error_code']) == 0:
                 for task_main in ret['data']['rows'][0]['cell_data']['activity_task']['accumulate_list']['task_list_v2']:
                     for task in task_main['task_list']:
                         task_list.append(task)
+                self._page_snapshot['task_list'] = task_list
 
         return task_list
 
     def do_sign_page_task(self):
-        """完成签到页任务"""
+        """完成签到页任务
+        
+        所有任务处理完毕并领取阶段奖励后记入本地台账，当天再次运行时不再发送任何请求（resume 为False时除外）。
+        """
+        if self.resume and self.ledger.is_done('sign_page'):
+            logger.info('签到页任务今日已完成，跳过。')
+            return
         
         logger.info('开始 签到页任务。')
         
@@ -581,11 +729,13 @@ class SMZDM():
         task_list = self._get_task_list()
         
         # 完成任务列表里可以完成的阅览任务
-        for task in task_list:
-            self._process_task(task)
+        finished = [self._process_task(task) for task in task_list]
             
         # 完成任务后确认是否有阶段奖励，并领取。
+        # 没有完成新任务时签到页面快照仍然有效，不会重复请求 show_view_v2
         self._get_extra_reward()
+        if task_list and all(finished):
+            self.ledger.mark_done('sign_page')
 
     def _query_lottery_times(self, active_id: str) -> int:
         '''
@@ -610,7 +760,7 @@ class SMZDM():
             match = re.search(r'\((\{.*\})\)', response.text)
             if match:
                 json_str = match.group(1)
-                data = json.loads(json_str)
+                data = json_utils.loads(json_str)
                 times = int(data.get('remain_free_lottery_count'))
                 return times
         return 0
@@ -632,7 +782,7 @@ class SMZDM():
             同时会记录抽奖结果信息到日志
         '''
         url = f"https://zhiyou.smzdm.com/user/lottery/jsonp_draw?active_id={active_id}"
-        response = self._request_with_retry("post", url, self.zhiyou_headers).json()
+        response = json_utils.response_json(self._request_with_retry("post", url, self.zhiyou_headers, idempotent=False))
         if response['error_code'] == 0:
             logger.info(response['error_msg'])
             return int(response['data']['remain_free_lottery_count'])
@@ -652,7 +802,7 @@ class SMZDM():
             dict: 包含活动详细信息的字典，如活动名称、开始时间、结束时间等
         '''
         url = f"https://zhiyou.smzdm.com/user/lottery/jsonp_get_active_info?active_id={active_id}"
-        response = self._request_with_retry("get", url, self.zhiyou_headers).json()
+        response = json_utils.response_json(self._request_with_retry("get", url, self.zhiyou_headers))
         return response.get('data', {})
 
     def do_lottery(self, active_id_list = None):
@@ -673,20 +823,25 @@ class SMZDM():
         if active_id_list is None:
             active_id_list = self.lottery_list
         for active_id in active_id_list:
-            ret_data = self._get_lottery_info(active_id)
-            logger.info(f'开始 抽奖{ret_data["active_name"]}({active_id})。')
+            if self._step_done(f'lottery:{active_id}'):
+                continue
+            # 抽奖活动信息与账号无关，各账号共享；剩余次数按账号查询
+            ret_data = self.discovery.get(('lottery_info', active_id), lambda: self._get_lottery_info(active_id))
             if ret_data:
+                logger.info(f'开始 抽奖{ret_data["active_name"]}({active_id})。')
                 start_date = ret_data.get('start_date', '')
                 end_date = ret_data.get('end_date', '')
                 lottery_times = self._query_lottery_times(active_id)
                 if (datetime.strptime(end_date, "%Y-%m-%d %H:%M:%S") >= datetime.now()) and (lottery_times > 0):
+                    # 抽奖请求间隔由限速器控制
                     while self._lottery(active_id) > 0:
-                        time.sleep(2)  # 避免请求过于频繁
+                        pass
                 else:
                     if datetime.strptime(end_date, "%Y-%m-%d %H:%M:%S") < datetime.now():
                         logger.info(f'抽奖任务{ret_data["active_name"]}({active_id})已结束。')
                     else:
                         logger.info(f'抽奖任务{ret_data["active_name"]}({active_id})抽奖次数已用完。')
+                self._finish_step(f'lottery:{active_id}')
 
     def _access_active_page(self, page_id):
         '''访问活动页面并收集活动ID和抽奖ID
@@ -708,14 +863,14 @@ class SMZDM():
                 if page_content_match:
                     
                     json_text = page_content_match.group(1)
-                    data = json.loads(json_text)
+                    data = json_utils.loads(json_text)
 
                     title = data['name']
                     logger.info(f"访问任务 {title}({page_id})")
-                    data = json.loads(data.get('content', ''))
+                    data = json_utils.loads(data.get('content', ''))
                     child_list = data.get('child', '')
 
-                    pretty = json.dumps(data, ensure_ascii=False, indent=2)
+                    pretty = json_utils.dumps(data, indent=True)
                     logger.debug(pretty)
 
                     id_list = []
@@ -723,10 +878,9 @@ class SMZDM():
                     self._collect_ids(child_list, id_list, lottery_list)
                     return title, id_list, lottery_list
             else:
-                json_text = extract_and_decode_base64(response.text)
-                data = json.loads(json_text)
+                data = json_utils.loads(extract_and_decode_base64(response.content))
 
-                pretty = json.dumps(data, ensure_ascii=False, indent=2)
+                pretty = json_utils.dumps(data, indent=True)
                 logger.debug(pretty)
 
                 if len(data) > 0:
@@ -761,17 +915,26 @@ class SMZDM():
         if topic_page_list is None:
             topic_page_list = self.topic_page_list
         for active_id in topic_page_list:
-            tilte, id_list, lottery_list = self._access_active_page(active_id)
-            # 对id_list和lottery_list进行去重
-            id_list = list(set(id_list))
-            lottery_list = list(set(lottery_list))
+            if self._step_done(f'topic:{active_id}'):
+                continue
+            # 专题页的活动和抽奖ID与账号无关，各账号共享同一份解析结果
+            tilte, id_list, lottery_list = self.discovery.get(
+                ('topic', active_id), lambda: self._access_active_page(active_id),
+                valid=lambda result: result[0] is not None)
+            if tilte is None:
+                # 专题页访问失败或活动已结束
+                continue
             
+            # 对id_list和lottery_list进行去重（保持页面中的顺序）
+            id_list = list(dict.fromkeys(id_list))
+            lottery_list = list(dict.fromkeys(lottery_list))
             logger.debug(f"{tilte} id: {str(id_list)}  lottery_id: {str(lottery_list)}")
-            if not (tilte is None):
-                self.do_activity_task(id_list)
-                time.sleep(2)
-                self.do_lottery(lottery_list)
-            time.sleep(2)
+            
+            activities_finished = self.do_activity_task(id_list)
+            self.do_lottery(lottery_list)
+            # 活动任务未全部完成时不记录专题页完成，下次运行重新处理未完成的部分
+            if activities_finished:
+                self._finish_step(f'topic:{active_id}')
 
     def _collect_ids(self, child_list, id_list, lottery_list):
         '''递归收集活动的任务ID和抽奖ID
@@ -797,23 +960,41 @@ class SMZDM():
             if 'child' in child and isinstance(child['child'], list) and child['child']:
                 self._collect_ids(child['child'], id_list, lottery_list)
 
-if __name__ == "__main__":
+@register_plugin
+class SMZDMPlugin(ScriptPlugin):
+    """什么值得买插件"""
 
-    accounts = get_user_infos(APP)
-    app_configs = get_app_configs(APP)
-    if not accounts:
-        logger.error("未找到有效的账户配置信息")
-        exit(1)
+    name = APP
+
+    def __init__(self):
+        self.discovery = DiscoveryCache()
 
-    for account in accounts:
-        cookie_str = account['cookie']
+    def run(self) -> bool:
+        # 每次运行重新发现活动，运行期间所有账号共享发现结果
+        self.discovery = DiscoveryCache()
+        return super().run()
+
+    def run_account(self, account, app_configs):
         logger.info(f"开始执行 {account['name']} 账号的任务")
     
-        smzdm = SMZDM(cookie_str)
+        smzdm = SMZDM(account['cookie'], account['name'], resume=app_configs.get('resume', True),
+                      discovery=self.discovery)
         smzdm.sign_main()
         smzdm.do_sign_page_task()
         smzdm.do_active(app_configs.get('topic_page_list', []))
         smzdm.do_activity_task(app_configs.get('activity_list', []))
         smzdm.do_lottery(app_configs.get('lottery_list', []))
         logger.info(f"执行 {account['name']} 账号的任务完成")
-        time.sleep(2)
+
+def main() -> bool:
+    """执行所有账号的任务。
+
+    Returns:
+        bool: 是否找到有效的账户配置信息
+    """
+    return SMZDMPlugin().run()
+
+if __name__ == "__main__":
+    setup_logger(APP)
+    if not main():
+        exit(1)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：smzdm_watch.py
+描述：什么值得买好价关注脚本，增量抓取排行榜文章保存到本地索引，命中关注条件的新文章推送通知
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+# 标准库
+import os
+import sys
+import time
+
+# 第三方库
+from loguru import logger
+
+# 将项目根目录添加到 sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# 本地应用/库
+from smzdm import APP as SMZDM_APP, SMZDM
+from utils.article_index import ArticleIndex
+from utils.config import get_app_configs, get_user_infos
+from utils.log_utils import setup_logger
+from utils.notify_utils import load_send
+from utils.plugin import ScriptPlugin, register_plugin
+
+APP = 'smzdm_watch'
+
+
+class DealWatcher:
+    """好价关注
+
+    每次轮询逐页抓取排行榜并写入文章索引，遇到一页文章均已收录且没有变化时停止翻页，
+    然后只在各关注条件上次检查之后新增或变化的文章中查询，推送成功后才记录为已推送。
+    """
+
+    def __init__(self, smzdm, index, max_articles=100):
+        """初始化好价关注
+
+        Args:
+            smzdm (SMZDM): 用于请求排行榜的实例，可在多次轮询间复用
+            index (ArticleIndex): 文章索引
+            max_articles (int, optional): 单次轮询最多抓取的文章数
+        """
+        self.smzdm = smzdm
+        self.index = index
+        self.max_articles = max_articles
+
+    def poll(self):
+        """增量抓取排行榜文章并写入索引
+
+        Returns:
+            dict: 本次请求的页数，以及新增、变化和无变化的文章数
+        """
+        counts = {'pages': 0, 'new': 0, 'changed': 0, 'unchanged': 0}
+        # 不预取下一页，没有新文章时只请求第一页
+        for page in self.smzdm.iter_rank_pages(max_articles=self.max_articles, prefetch=False):
+            counts['pages'] += 1
+            result = self.index.upsert(page)
+            for key in ('new', 'changed', 'unchanged'):
+                counts[key] += len(result[key])
+            if not result['new'] and not result['changed']:
+                # 这一页都是已收录且没有变化的文章，后面的历史文章不再抓取
+                break
+        return counts
+
+    def match(self, watches, poll_started):
+        """查询关注条件上次检查之后新增或变化、且尚未推送过的文章
+
+        Args:
+            watches (list): 关注条件列表，每项包含 name、keywords、max_price、min_price、min_worthy
+            poll_started (float): 本次轮询开始的时间戳，首次检查的关注条件从该时间开始查询
+
+        Returns:
+            dict: 关注条件名称 -> 尚未推送过的文章列表
+        """
+        hits = {}
+        for watch in watches:
+            name = watch.get('name') or ','.join(watch.get('keywords', []))
+            cursor = self.index.watch_cursor(name)
+            articles = self.index.query(
+                keywords=watch.get('keywords', []),
+                max_price=watch.get('max_price'),
+                min_price=watch.get('min_price'),
+                min_worthy=watch.get('min_worthy', 0),
+                since=poll_started if cursor is None else cursor,
+            )
+            fresh = set(self.index.unnotified(name, [article['article_id'] for article in articles]))
+            hits[name] = [article for article in articles if article['article_id'] in fresh]
+        return hits
+
+    def run(self, watches):
+        """执行一次轮询并推送命中的文章
+
+        只有消息确认送达后才记录命中的文章为已推送并前移关注条件的检查时间；推送失败抛出异常或
+        notify模块不可用时不记录，下次轮询重新推送。批量推送模式下也立即推送，以便得到推送结果。
+
+        Args:
+            watches (list): 关注条件列表
+
+        Returns:
+            dict: 关注条件名称 -> 本次推送的文章列表
+        """
+        poll_started = time.time()
+        counts = self.poll()
+        logger.info(f"排行榜文章: 请求{counts['pages']}页，新增{counts['new']}篇，"
+                    f"变化{counts['changed']}篇，无变化{counts['unchanged']}篇")
+
+        hits = self.match(watches, poll_started)
+        lines = []
+        for name, articles in hits.items():
+            if not articles:
+                continue
+            lines.append(f"【{name}】")
+            for article in articles:
+                lines.append(f"{article['title']} {article['price']} 值{article['worthy']}/不值{article['unworthy']}")
+                lines.append(article['url'])
+        if lines:
+            logger.info('\n'.join(lines))
+            if not load_send('什么值得买好价关注', '\n'.join(lines), immediate=True):
+                logger.warning('好价推送未送达，命中的文章下次轮询重新推送')
+                return {}
+        for name, articles in hits.items():
+            self.index.mark_notified(name, [article['article_id'] for article in articles], poll_started)
+        return {name: articles for name, articles in hits.items() if articles}
+
+
+@register_plugin
+class SMZDMWatchPlugin(ScriptPlugin):
+    """什么值得买好价关注插件
+
+    使用 smzdm 的第一个账号请求排行榜，关注条件配置在 smzdm.app_configs.deal_watch 中。
+    常驻进程中插件实例在多次轮询间保留，请求客户端和文章索引只创建一次。
+    """
+
+    name = APP
+
+    def __init__(self):
+        self._clients = {}
+        self._indexes = {}
+
+    def accounts(self):
+        return get_user_infos(SMZDM_APP)[:1]
+
+    def app_configs(self):
+        return (get_app_configs(SMZDM_APP) or {}).get('deal_watch') or {}
+
+    def run(self) -> bool:
+        if not self.app_configs().get('watches'):
+            logger.info(f"{self.name}: 未配置关注条件，跳过")
+            return True
+        return super().run()
+
+    def run_account(self, account, app_configs):
+        # 配置热加载更新Cookie后重新创建客户端
+        client = self._clients.get(account['cookie'])
+        if client is None:
+            self._clients.clear()
+            client = self._clients[account['cookie']] = SMZDM(account['cookie'], account['name'])
+        db_path = app_configs.get('db_path')
+        index = self._indexes.get(db_path)
+        if index is None:
+            index = self._indexes[db_path] = ArticleIndex(db_path)
+        DealWatcher(client, index, app_configs.get('max_articles', 100)).run(app_configs['watches'])
+
+
+def main() -> bool:
+    """执行一次好价关注轮询。
+
+    Returns:
+        bool: 是否找到有效的账户配置信息
+    """
+    return SMZDMWatchPlugin().run()
+
+
+if __name__ == "__main__":
+    setup_logger(APP)
+    if not main():
+        exit(1)
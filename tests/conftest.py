@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""
+文件名：conftest.py
+描述：测试公共配置，将项目根目录和脚本目录添加到 sys.path
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+# 脚本之间以 "from smzdm import ..." 的方式相互导入，测试中同样直接导入脚本模块
+for path in (os.path.join(project_root, 'scripts'), project_root):
+    if path not in sys.path:
+        sys.path.insert(0, path)
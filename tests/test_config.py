@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+文件名：test_config.py
+描述：YAML配置与环境变量覆盖的分层合并测试
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+from utils.config import (CONFIG_SECTIONS, CompositeConfigSource, ConfigLoader, EnvironmentConfigSource,
+                          YamlConfigSource, deep_merge)
+
+YAML = '''
+smzdm:
+  user_infos:
+    - {name: a, cookie: 'sess=a;'}
+    - {name: b, cookie: 'sess=b;'}
+  app_configs:
+    resume: true
+    max_articles: 100
+'''
+
+
+def _loader(tmp_path):
+    config_path = tmp_path / 'app_config.yaml'
+    config_path.write_text(YAML, encoding='utf-8')
+    return ConfigLoader(CompositeConfigSource([
+        YamlConfigSource(str(config_path), use_snapshot=False),
+        EnvironmentConfigSource(nested_only=True, sections=CONFIG_SECTIONS),
+    ]))
+
+
+def test_env_overrides_single_account_field(tmp_path, monkeypatch):
+    monkeypatch.setenv('SMZDM__USER_INFOS__1__COOKIE', 'sess=new;')
+    monkeypatch.setenv('SMZDM__APP_CONFIGS__RESUME', 'false')
+
+    loader = _loader(tmp_path)
+
+    # 只覆盖第二个账号的cookie，账号列表和其他字段保持不变
+    assert loader.get_user_infos('smzdm') == [
+        {'name': 'a', 'cookie': 'sess=a;'},
+        {'name': 'b', 'cookie': 'sess=new;'},
+    ]
+    # 环境变量值按YAML标量解析
+    assert loader.get_app_configs('smzdm') == {'resume': False, 'max_articles': 100}
+
+
+def test_env_outside_config_sections_is_ignored(tmp_path, monkeypatch):
+    monkeypatch.setenv('UNRELATED__SMZDM__RESUME', 'false')
+    monkeypatch.setenv('__CF_USER_TEXT_ENCODING', '0x1F5:0x19:0x34')
+
+    assert _loader(tmp_path).get_app_configs('smzdm')['resume'] is True
+
+
+def test_env_change_triggers_reload(tmp_path, monkeypatch):
+    loader = _loader(tmp_path)
+    assert loader.get_app_configs('smzdm')['max_articles'] == 100
+    assert not loader.reload()
+
+    monkeypatch.setenv('SMZDM__APP_CONFIGS__MAX_ARTICLES', '40')
+    assert loader.reload()
+    assert loader.get_app_configs('smzdm')['max_articles'] == 40
+
+
+def test_coerce_value_keeps_leading_zero_strings():
+    coerce = EnvironmentConfigSource._coerce_value
+    assert coerce('false') is False
+    assert coerce('3') == 3
+    assert coerce('0.5') == 0.5
+    assert coerce('0123') == '0123'
+    assert coerce('sess=x;') == 'sess=x;'
+    assert coerce('[1, 2]') == [1, 2]
+
+
+def test_deep_merge_index_dict_without_base_list_becomes_list():
+    merged = deep_merge({'smzdm': {}}, {'smzdm': {'user_infos': {'1': {'cookie': 'b'}, '0': {'cookie': 'a'}}}})
+    assert merged == {'smzdm': {'user_infos': [{'cookie': 'a'}, {'cookie': 'b'}]}}
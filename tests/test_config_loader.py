@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+文件名：test_config_loader.py
+描述：配置加载器的延迟加载和缓存测试
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+import threading
+import time
+
+from utils.config import ConfigLoader, ConfigSourceBase
+
+
+class CountingSource(ConfigSourceBase):
+    """记录加载次数的配置源"""
+
+    def __init__(self, data):
+        self.data = data
+        self.loads = 0
+        self.changed = False
+
+    def load_config(self):
+        self.loads += 1
+        time.sleep(0.01)
+        return self.data
+
+    def has_changed(self):
+        return self.changed
+
+
+def test_config_not_loaded_until_first_access():
+    source = CountingSource({'smzdm': {'app_configs': {'resume': True}}})
+    loader = ConfigLoader(source)
+    assert source.loads == 0
+
+    assert loader.get_app_configs('smzdm') == {'resume': True}
+    assert loader.get_user_infos('smzdm') == []
+    assert loader.get_common_settings('retry') is None
+    assert source.loads == 1
+
+
+def test_concurrent_first_access_loads_once():
+    source = CountingSource({'common': {'retry': {'budget': 10}}})
+    loader = ConfigLoader(source)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(loader.get_common_settings('retry')))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [{'budget': 10}] * 8
+    assert source.loads == 1
+
+
+def test_reload_only_when_source_changed():
+    source = CountingSource({})
+    loader = ConfigLoader(source)
+    loader.get_app_configs()
+
+    assert not loader.reload()
+    source.changed = True
+    assert loader.reload()
+    assert loader.reload(force=True)
+    assert source.loads == 3
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+文件名：test_rate_limit.py
+描述：令牌桶和按主机限速器的测试
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+import pytest
+
+from utils import rate_limit
+from utils.rate_limit import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    """可手动推进的 time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit.time, 'monotonic', fake)
+    return fake
+
+
+def test_bucket_allows_burst_then_spaces_requests(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    # 令牌用完后按预约顺序依次等待 0.5、1.0 秒
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_bucket_refills_up_to_burst(clock):
+    bucket = TokenBucket(rate=1, burst=2)
+    bucket.reserve()
+    bucket.reserve()
+    clock.now += 60
+    # 空闲再久也只累积 burst 个令牌
+    assert [bucket.reserve() for _ in range(2)] == [0, 0]
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_limiter_per_host_and_config_precedence(clock):
+    limiter = RateLimiter({'hosts': {'a.example.com': {'rate': 1, 'burst': 1}}})
+    limiter.set_default_limit('a.example.com', rate=100, burst=10)
+    limiter.set_default_limit('b.example.com', rate=1, burst=1)
+
+    # 配置文件中的设置优先于脚本提供的默认限制
+    assert limiter._bucket('https://a.example.com/x').rate == 1
+    assert limiter._bucket('https://b.example.com/x').rate == 1
+    # 未配置且没有 default 的主机不限速
+    assert limiter._bucket('https://c.example.com/x') is None
+    assert limiter.wait('https://c.example.com/x') == 0.0
+
+
+def test_limiter_custom_key_is_separate_from_host(clock):
+    limiter = RateLimiter()
+    limiter.set_default_limit('api.example.com', rate=1, burst=1)
+    limiter.set_default_limit('api.example.com/clock', rate=1, burst=2)
+
+    host_bucket = limiter._bucket('https://api.example.com/sign')
+    key_bucket = limiter._bucket('https://api.example.com/sign', 'api.example.com/clock')
+    assert host_bucket is not key_bucket
+    assert key_bucket.burst == 2
+
+
+def test_set_default_limit_none_removes_limit(clock):
+    limiter = RateLimiter()
+    limiter.set_default_limit('api.example.com', rate=1, burst=1)
+    assert limiter._bucket('https://api.example.com/') is not None
+    limiter.set_default_limit('api.example.com', rate=None)
+    assert limiter._bucket('https://api.example.com/') is None
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+文件名：test_retry.py
+描述：重试引擎的熔断器状态切换和重试预算作用域测试
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+import contextvars
+import threading
+import time
+
+import pytest
+import requests
+
+from utils.retry import CircuitOpenError, RetryEngine
+
+URL = 'https://example.com/api'
+
+
+class FakeResponse:
+    """只包含重试引擎用到的属性的响应"""
+
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.elapsed = None
+
+
+class FakeSession:
+    """按顺序返回预设响应（或抛出预设异常）的会话"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+def _engine(**settings):
+    return RetryEngine({'max_attempts': 1, 'breaker_threshold': 1, 'breaker_reset': 0.05, **settings})
+
+
+def _request(engine, session):
+    return engine.request(session, 'GET', URL, rate_limited=False)
+
+
+def test_breaker_probe_rate_limited_reopens_then_recovers():
+    engine = _engine()
+    session = FakeSession(500, 429, 200, 200)
+
+    # 连续失败达到阈值后熔断
+    assert _request(engine, session).status_code == 500
+    with pytest.raises(CircuitOpenError):
+        _request(engine, session)
+
+    # 冷却结束后的探测请求被限流，重新熔断
+    time.sleep(0.06)
+    assert _request(engine, session).status_code == 429
+    with pytest.raises(CircuitOpenError):
+        _request(engine, session)
+
+    # 再次冷却后探测成功，恢复正常
+    time.sleep(0.06)
+    assert _request(engine, session).status_code == 200
+    assert _request(engine, session).status_code == 200
+    assert session.calls == 4
+
+
+def test_breaker_probe_exception_reopens():
+    engine = _engine()
+    session = FakeSession(500, ValueError('unexpected'), 200)
+
+    _request(engine, session)
+    time.sleep(0.06)
+    with pytest.raises(ValueError):
+        _request(engine, session)
+    with pytest.raises(CircuitOpenError):
+        _request(engine, session)
+
+    time.sleep(0.06)
+    assert _request(engine, session).status_code == 200
+
+
+def test_rate_limited_responses_do_not_open_breaker():
+    engine = _engine(breaker_threshold=2)
+    session = FakeSession(429, 429, 429, 200)
+
+    for _ in range(3):
+        assert _request(engine, session).status_code == 429
+    assert _request(engine, session).status_code == 200
+
+
+def test_budget_scope_is_isolated_per_run():
+    engine = RetryEngine({'max_attempts': 3, 'base_delay': 0, 'jitter': 0, 'budget': 1})
+    results = {}
+
+    def run(name):
+        with engine.budget_scope() as budget:
+            session = FakeSession(requests.ConnectionError(), requests.ConnectionError(), 200)
+            with pytest.raises(requests.ConnectionError):
+                engine.request(session, 'GET', URL, rate_limited=False)
+            results[name] = (session.calls, budget.remaining)
+
+    threads = [threading.Thread(target=contextvars.copy_context().run, args=(run, name)) for name in ('a', 'b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 每次运行各自用完一次重试，互不占用
+    assert results == {'a': (2, 0), 'b': (2, 0)}
+    # 作用域之外的请求使用默认预算，不受已结束的运行影响
+    assert engine._default_budget.remaining == 1
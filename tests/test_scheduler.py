@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+文件名：test_scheduler.py
+描述：cron表达式解析和下一次触发时间计算的测试
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+from datetime import datetime
+
+import pytest
+
+from utils.scheduler import CronExpression
+
+
+def test_parse_step_range_and_list():
+    cron = CronExpression('*/10 8-10,22 * * 1-5')
+    assert cron.minutes == {0, 10, 20, 30, 40, 50}
+    assert cron.hours == {8, 9, 10, 22}
+    assert cron.weekdays == {1, 2, 3, 4, 5}
+
+
+def test_sunday_as_zero_or_seven():
+    assert CronExpression('0 0 * * 7').weekdays == {0}
+    assert CronExpression('0 0 * * 0').weekdays == {0}
+
+
+@pytest.mark.parametrize('expression, now, expected', [
+    ('*/10 * * * *', datetime(2026, 10, 19, 8, 3, 59), datetime(2026, 10, 19, 8, 10)),
+    # 恰好在触发时刻时取下一次
+    ('*/10 * * * *', datetime(2026, 10, 19, 8, 10), datetime(2026, 10, 19, 8, 20)),
+    ('30 8 * * *', datetime(2026, 10, 19, 9, 0), datetime(2026, 10, 20, 8, 30)),
+    # 跨月、跨年
+    ('0 0 1 * *', datetime(2026, 12, 15, 12, 0), datetime(2027, 1, 1, 0, 0)),
+    # 2026-10-19 为周一，下一个周日为10-25
+    ('0 9 * * 0', datetime(2026, 10, 19, 12, 0), datetime(2026, 10, 25, 9, 0)),
+    # 日和周同时限制时满足其一即可：10-20为周二，先于1号
+    ('0 0 1 * 2', datetime(2026, 10, 19, 12, 0), datetime(2026, 10, 20, 0, 0)),
+    ('0 0 29 2 *', datetime(2026, 3, 1), datetime(2028, 2, 29, 0, 0)),
+])
+def test_next_after(expression, now, expected):
+    assert CronExpression(expression).next_after(now) == expected
+
+
+@pytest.mark.parametrize('expression', ['* * * *', '60 * * * *', '* 24 * * *', '*/0 * * * *', '5-1 * * * *'])
+def test_invalid_expression(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_expression_without_trigger_time():
+    with pytest.raises(ValueError):
+        CronExpression('0 0 31 2 *').next_after(datetime(2026, 10, 19))
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+文件名：test_smzdm_rank.py
+描述：什么值得买排行榜逐页获取（去重、过滤、按需翻页和预取）的测试
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+import threading
+
+import pytest
+
+from utils import state_store
+from smzdm import SMZDM
+
+
+def _rows(offset, count):
+    return [{'article_id': str(1000 + i), 'article_title': f'文章{i}', 'cell_type': '21001',
+             'article_worthy': i, 'article_unworthy': 0} for i in range(offset, offset + count)]
+
+
+class FakeRankList:
+    """按 offset 返回预设页面并记录请求的排行榜接口"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, offset, exclude_ids):
+        with self.lock:
+            self.calls.append((offset, list(exclude_ids)))
+        return self.pages.get(offset, [])
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_store, 'DATA_DIR', str(tmp_path))
+    return SMZDM('sess=test;', 'test')
+
+
+def test_pages_deduplicated_and_filtered(client):
+    second = _rows(20, 20)
+    # 排行变化导致第一页的文章再次出现在第二页
+    second[0] = dict(_rows(5, 1)[0])
+    first = _rows(0, 20)
+    first[3]['cell_type'] = '21017'
+    fake = client._fetch_rank_page = FakeRankList({0: first, 20: second, 40: _rows(40, 5)})
+
+    pages = list(client.iter_rank_pages())
+
+    assert [len(page) for page in pages] == [19, 19, 5]
+    ids = [article['article_id'] for page in pages for article in page]
+    assert len(ids) == len(set(ids))
+    assert '1003' not in ids
+    # 最后一页不足一页时不再请求
+    assert [offset for offset, _ in fake.calls] == [0, 20, 40]
+    # 翻页时排除已获取的文章
+    assert fake.calls[1][1] == [str(1000 + i) for i in range(20)]
+
+
+def test_max_articles_limits_requests(client):
+    fake = client._fetch_rank_page = FakeRankList({0: _rows(0, 20), 20: _rows(20, 20), 40: _rows(40, 20)})
+
+    articles = list(client.iter_rank_list(max_articles=40))
+
+    assert len(articles) == 40
+    assert [offset for offset, _ in fake.calls] == [0, 20]
+
+
+def test_without_prefetch_stopping_early_fetches_one_page(client):
+    fake = client._fetch_rank_page = FakeRankList({0: _rows(0, 20), 20: _rows(20, 20)})
+
+    pages = client.iter_rank_pages(prefetch=False)
+    next(pages)
+    pages.close()
+
+    assert [offset for offset, _ in fake.calls] == [0]
+
+
+def test_prefetch_requests_next_page_while_consuming(client):
+    fake = client._fetch_rank_page = FakeRankList({0: _rows(0, 20), 20: _rows(20, 20)})
+
+    pages = client.iter_rank_pages()
+    next(pages)
+    pages.close()
+
+    assert [offset for offset, _ in fake.calls] == [0, 20]
+
+
+def test_iter_rank_list_vote_filters(client):
+    client._fetch_rank_page = FakeRankList({0: _rows(0, 10)})
+    assert [a['article_worthy'] for a in client.iter_rank_list(min_worthy=7)] == [7, 8, 9]
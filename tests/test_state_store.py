@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+文件名：test_state_store.py
+描述：按天记录任务进度的本地台账测试
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+import os
+
+import pytest
+
+from utils import state_store
+from utils.state_store import TaskLedger
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_store, 'DATA_DIR', str(tmp_path))
+    return tmp_path
+
+
+def test_progress_survives_restart_on_same_day():
+    ledger = TaskLedger('smzdm', 'account', day='2026-10-19')
+    ledger.mark_done('step:checkin')
+    ledger.increment('task:1:views')
+    ledger.increment('task:1:views')
+    ledger.set('task:1:synced_at', 123.0)
+    ledger.set('task:1:synced_at', None)
+
+    reloaded = TaskLedger('smzdm', 'account', day='2026-10-19')
+    assert reloaded.is_done('step:checkin')
+    assert reloaded.get('task:1:views') == 2
+    assert reloaded.get('task:1:synced_at') is None
+
+
+def test_new_day_starts_empty_ledger():
+    ledger = TaskLedger('smzdm', 'account', day='2026-10-19')
+    ledger.mark_done('step:checkin')
+
+    next_day = TaskLedger('smzdm', 'account', day='2026-10-20')
+    assert not next_day.is_done('step:checkin')
+    with open(next_day.path, encoding='utf-8') as f:
+        assert f.read() == '{"day": "2026-10-20"}\n'
+
+    # 回到前一天的台账时，旧记录已随日期切换清空
+    assert not TaskLedger('smzdm', 'account', day='2026-10-19').is_done('step:checkin')
+
+
+def test_accounts_use_separate_files():
+    first = TaskLedger('smzdm', 'cookie-a', day='2026-10-19')
+    second = TaskLedger('smzdm', 'cookie-b', day='2026-10-19')
+    first.mark_done('step:checkin')
+
+    assert first.path != second.path
+    assert 'cookie-a' not in os.path.basename(first.path)
+    assert not TaskLedger('smzdm', 'cookie-b', day='2026-10-19').is_done('step:checkin')
+
+
+def test_truncated_last_line_is_ignored():
+    ledger = TaskLedger('smzdm', 'account', day='2026-10-19')
+    ledger.mark_done('step:checkin')
+    with open(ledger.path, 'a', encoding='utf-8') as f:
+        f.write('{"k": "step:lottery", "v": tr')
+
+    reloaded = TaskLedger('smzdm', 'account', day='2026-10-19')
+    assert reloaded.is_done('step:checkin')
+    assert not reloaded.is_done('step:lottery')
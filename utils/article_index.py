@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：article_index.py
+描述：本地文章索引，使用SQLite保存抓取到的商品文章，支持增量更新和按关键词、价格查询
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.state_store import DATA_DIR
+
+# 价格文本中的第一个数字，如 "59.9元"、"149元（需用券）"、"2件5折"
+_PRICE_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS articles (
+    article_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    price TEXT,
+    price_value REAL,
+    worthy INTEGER NOT NULL DEFAULT 0,
+    unworthy INTEGER NOT NULL DEFAULT 0,
+    comments INTEGER NOT NULL DEFAULT 0,
+    url TEXT,
+    digest TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_price ON articles (price_value);
+CREATE INDEX IF NOT EXISTS idx_articles_updated ON articles (updated_at);
+CREATE INDEX IF NOT EXISTS idx_articles_first_seen ON articles (first_seen);
+CREATE TABLE IF NOT EXISTS watch_hits (
+    watch TEXT NOT NULL,
+    article_id TEXT NOT NULL,
+    notified_at REAL NOT NULL,
+    PRIMARY KEY (watch, article_id)
+);
+CREATE TABLE IF NOT EXISTS watch_cursors (
+    watch TEXT PRIMARY KEY,
+    checked_until REAL NOT NULL
+);
+'''
+
+
+def parse_price(price: Optional[str]) -> Optional[float]:
+    """从价格文本中解析价格数值。
+
+    Args:
+        price: 价格文本
+
+    Returns:
+        Optional[float]: 价格数值，无法解析时返回None
+    """
+    match = _PRICE_PATTERN.search(price or '')
+    return float(match.group()) if match else None
+
+
+class ArticleIndex:
+    """基于SQLite的文章索引。
+
+    文章按 article_id 去重，只有标题、价格或链接变化时才视为变化，updated_at 记录最后一次变化的时间，
+    用于查询本次抓取中新增或变化的文章，first_seen 记录首次收录的时间。投票数和评论数单独更新，
+    不影响 updated_at，避免热门文章因计数变化被反复当作变化的文章。
+    watch_hits 表记录每个关注条件已推送过的文章，避免重复推送；watch_cursors 表记录每个关注条件
+    已检查到的时间，推送失败时不前移，下次轮询重新检查。
+
+    Attributes:
+        path: 数据库文件路径
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """打开（必要时创建）文章索引。
+
+        Args:
+            path: 数据库文件路径，默认为 data/articles.db
+        """
+        self.path = path or os.path.join(DATA_DIR, 'articles.db')
+        directory = os.path.dirname(self.path) if self.path != ':memory:' else ''
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """关闭数据库连接。"""
+        self._conn.close()
+
+    @staticmethod
+    def _row(article: dict) -> Tuple:
+        """将接口返回的文章转换为数据库字段。"""
+        article_id = str(article['article_id'])
+        title = article.get('article_title', '')
+        price = article.get('article_price', '')
+        worthy = int(article.get('article_worthy', 0) or 0)
+        unworthy = int(article.get('article_unworthy', 0) or 0)
+        comments = int(article.get('article_comment', 0) or 0)
+        url = article.get('article_url') or f'https://www.smzdm.com/p/{article_id}/'
+        digest = hashlib.sha1(f'{title}\x00{price}\x00{url}'.encode('utf-8')).hexdigest()
+        return article_id, title, price, parse_price(price), worthy, unworthy, comments, url, digest
+
+    def upsert(self, articles: Iterable[dict]) -> Dict[str, List[str]]:
+        """写入一批文章，只插入新文章、更新有变化的文章。
+
+        Args:
+            articles: 接口返回的文章列表，必须包含 article_id
+
+        Returns:
+            Dict[str, List[str]]: {'new': 新增的文章ID, 'changed': 标题、价格或链接变化的文章ID,
+            'unchanged': 无变化（或只有计数变化）的文章ID}
+        """
+        rows = [self._row(article) for article in articles if article.get('article_id')]
+        result = {'new': [], 'changed': [], 'unchanged': []}
+        if not rows:
+            return result
+        now = time.time()
+        with self._lock, self._conn:
+            placeholders = ','.join('?' * len(rows))
+            known = {record[0]: (record[1], tuple(record[2:])) for record in self._conn.execute(
+                f'SELECT article_id, digest, worthy, unworthy, comments FROM articles WHERE article_id IN ({placeholders})',
+                [row[0] for row in rows]
+            )}
+            for row in rows:
+                article_id, digest, counters = row[0], row[-1], row[4:7]
+                if article_id not in known:
+                    self._conn.execute(
+                        'INSERT INTO articles (article_id, title, price, price_value, worthy, unworthy, comments, url,'
+                        ' digest, first_seen, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        (*row, now, now)
+                    )
+                    known[article_id] = (digest, counters)
+                    result['new'].append(article_id)
+                elif known[article_id][0] != digest:
+                    self._conn.execute(
+                        'UPDATE articles SET title = ?, price = ?, price_value = ?, worthy = ?, unworthy = ?,'
+                        ' comments = ?, url = ?, digest = ?, updated_at = ? WHERE article_id = ?',
+                        (*row[1:], now, article_id)
+                    )
+                    known[article_id] = (digest, counters)
+                    result['changed'].append(article_id)
+                else:
+                    if known[article_id][1] != counters:
+                        # 只更新计数，不改变 updated_at
+                        self._conn.execute(
+                            'UPDATE articles SET worthy = ?, unworthy = ?, comments = ? WHERE article_id = ?',
+                            (*counters, article_id)
+                        )
+                        known[article_id] = (digest, counters)
+                    result['unchanged'].append(article_id)
+        return result
+
+    def query(self, keywords: Sequence[str] = (), max_price: Optional[float] = None, min_price: Optional[float] = None,
+              min_worthy: int = 0, since: Optional[float] = None, limit: int = 100) -> List[dict]:
+        """按条件查询文章，按最后变化时间倒序排列。
+
+        Args:
+            keywords: 标题关键词，满足任意一个即可，为空时不限制
+            max_price: 最高价格
+            min_price: 最低价格
+            min_worthy: "值"的最低票数
+            since: 只查询该时间戳之后新增或变化的文章
+            limit: 最多返回的文章数
+
+        Returns:
+            List[dict]: 文章列表
+        """
+        conditions, params = ['worthy >= ?'], [min_worthy]
+        if keywords:
+            conditions.append('(' + ' OR '.join('title LIKE ?' for _ in keywords) + ')')
+            params.extend(f'%{keyword}%' for keyword in keywords)
+        if max_price is not None:
+            conditions.append('price_value <= ?')
+            params.append(max_price)
+        if min_price is not None:
+            conditions.append('price_value >= ?')
+            params.append(min_price)
+        if since is not None:
+            conditions.append('updated_at >= ?')
+            params.append(since)
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT * FROM articles WHERE {" AND ".join(conditions)} ORDER BY updated_at DESC LIMIT ?', params
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def watch_cursor(self, watch: str) -> Optional[float]:
+        """获取关注条件已检查到的时间。
+
+        Args:
+            watch: 关注条件名称
+
+        Returns:
+            Optional[float]: 时间戳，尚未检查过时返回None
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT checked_until FROM watch_cursors WHERE watch = ?', (watch,)).fetchone()
+        return row[0] if row else None
+
+    def unnotified(self, watch: str, article_ids: Sequence[str]) -> List[str]:
+        """筛选出关注条件尚未推送过的文章ID。
+
+        Args:
+            watch: 关注条件名称
+            article_ids: 命中的文章ID
+
+        Returns:
+            List[str]: 尚未推送过的文章ID，保持输入顺序
+        """
+        if not article_ids:
+            return []
+        placeholders = ','.join('?' * len(article_ids))
+        with self._lock:
+            notified = {row[0] for row in self._conn.execute(
+                f'SELECT article_id FROM watch_hits WHERE watch = ? AND article_id IN ({placeholders})',
+                [watch, *article_ids]
+            )}
+        return [article_id for article_id in article_ids if article_id not in notified]
+
+    def mark_notified(self, watch: str, article_ids: Sequence[str], checked_until: float) -> None:
+        """推送成功后记录已推送的文章，并将关注条件的检查时间前移。
+
+        Args:
+            watch: 关注条件名称
+            article_ids: 已推送的文章ID
+            checked_until: 本次检查覆盖到的时间戳
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO watch_hits (watch, article_id, notified_at) VALUES (?, ?, ?)',
+                [(watch, article_id, now) for article_id in article_ids]
+            )
+            self._conn.execute(
+                'INSERT INTO watch_cursors (watch, checked_until) VALUES (?, ?)'
+                ' ON CONFLICT (watch) DO UPDATE SET checked_until = excluded.checked_until',
+                (watch, checked_until)
+            )
@@ -5,15 +5,23 @@
 描述：配置加载模块，用于读取和管理应用配置
 作者：herryfish
 创建日期：2024-03-17
-最后修改：2024-03-17
+最后修改：2026-10-19
 """
 
 import os
 import abc
+import hashlib
+import marshal
+import threading
 import yaml
-import re
 from loguru import logger
-from typing import Dict, List, Optional, Any, Type
+from typing import Dict, Iterable, List, Optional, Any, Type
+
+# 优先使用libyaml提供的C解析器，未编译libyaml时回退到纯Python实现
+YamlSafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# 默认配置中允许由环境变量覆盖的顶层配置节，新增脚本时需要同时添加
+CONFIG_SECTIONS = ('common', 'signin_type_1', 'smzdm', 'longzhu')
 
 class ConfigSourceBase(abc.ABC):
     """配置源抽象基类，定义配置加载的接口。
@@ -29,23 +37,58 @@ class ConfigSourceBase(abc.ABC):
             dict: 配置数据字典
         """
         pass
+    
+    def has_changed(self) -> bool:
+        """判断配置源自上次加载后是否发生变化。
+        
+        默认实现认为配置源不会变化，子类可按需重写以支持热加载。
+        
+        Returns:
+            bool: 配置源是否已变化
+        """
+        return False
 
 class YamlConfigSource(ConfigSourceBase):
     """YAML配置源实现类。
     
     从YAML文件加载配置数据。
+    解析结果会以marshal格式写入配置文件旁的快照文件，后续运行时若YAML文件的
+    修改时间、大小或内容哈希未变化，则直接读取快照，跳过YAML解析。
     
     Attributes:
         config_path: YAML配置文件的路径
+        snapshot_path: 编译快照文件的路径，为None时不使用快照
     """
     
-    def __init__(self, config_path: str):
+    SNAPSHOT_SUFFIX = '.cache'
+    SNAPSHOT_VERSION = 1
+    
+    def __init__(self, config_path: str, use_snapshot: bool = True):
         """初始化YAML配置源。
         
         Args:
             config_path: YAML配置文件的路径
+            use_snapshot: 是否使用编译快照缓存，默认为True
         """
         self.config_path = config_path
+        self.snapshot_path = config_path + self.SNAPSHOT_SUFFIX if use_snapshot else None
+        self._loaded_stat: Optional[tuple] = None
+    
+    def _file_stat(self) -> Optional[tuple]:
+        """获取配置文件的修改时间和大小，文件不存在时返回None。"""
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def has_changed(self) -> bool:
+        """根据文件修改时间和大小判断配置文件是否已变化。
+        
+        Returns:
+            bool: 配置文件是否已变化
+        """
+        return self._loaded_stat is None or self._file_stat() != self._loaded_stat
     
     def load_config(self) -> dict:
         """从YAML文件加载配置数据。
@@ -53,12 +96,67 @@ class YamlConfigSource(ConfigSourceBase):
         Returns:
             dict: 配置数据字典
         """
+        self._loaded_stat = self._file_stat()
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f) or {}
+            if self.snapshot_path is None:
+                with open(self.config_path, 'r', encoding='utf-8') as f:
+                    return yaml.load(f, Loader=YamlSafeLoader) or {}
+            return self._load_with_snapshot()
         except Exception as e:
             logger.error(f"加载YAML配置文件失败: {str(e)}")
             return {}
+    
+    def _load_with_snapshot(self) -> dict:
+        """优先从快照加载配置，快照失效时解析YAML并重写快照。
+        
+        Returns:
+            dict: 配置数据字典
+        """
+        stat = os.stat(self.config_path)
+        snapshot = self._read_snapshot()
+        if snapshot and snapshot['mtime_ns'] == stat.st_mtime_ns and snapshot['size'] == stat.st_size:
+            return snapshot['data']
+        
+        with open(self.config_path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha1(raw).hexdigest()
+        if snapshot and snapshot['sha1'] == digest:
+            # 仅修改时间变化（如touch），内容未变，刷新快照中的文件元数据即可
+            data = snapshot['data']
+        else:
+            data = yaml.load(raw.decode('utf-8'), Loader=YamlSafeLoader) or {}
+        
+        self._write_snapshot({
+            'version': self.SNAPSHOT_VERSION,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha1': digest,
+            'data': data,
+        })
+        return data
+    
+    def _read_snapshot(self) -> Optional[dict]:
+        """读取快照文件，文件不存在或格式不符时返回None。"""
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(snapshot, dict) or snapshot.get('version') != self.SNAPSHOT_VERSION:
+            return None
+        return snapshot
+    
+    def _write_snapshot(self, snapshot: dict) -> None:
+        """原子写入快照文件，写入失败（如只读目录、含marshal不支持的类型）时忽略。"""
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                marshal.dump(snapshot, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except (OSError, ValueError) as e:
+            logger.debug(f"写入配置快照失败: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
 class EnvironmentConfigSource(ConfigSourceBase):
     """环境变量配置源实现类。
@@ -69,17 +167,54 @@ class EnvironmentConfigSource(ConfigSourceBase):
     Attributes:
         prefix: 环境变量前缀，用于筛选相关环境变量
         separator: 环境变量名称中的分隔符，用于解析嵌套结构
+        nested_only: 是否只加载名称中包含分隔符的环境变量
+        sections: 允许加载的顶层配置节，为None时不限制
     """
     
-    def __init__(self, prefix: str = "", separator: str = "__"):
+    def __init__(self, prefix: str = "", separator: str = "__", nested_only: bool = False,
+                 sections: Optional[Iterable[str]] = None):
         """初始化环境变量配置源。
         
         Args:
             prefix: 环境变量前缀，只加载以此前缀开头的环境变量，默认为空字符串（加载所有环境变量）
             separator: 环境变量名称中的分隔符，用于解析嵌套结构，默认为双下划线
+            nested_only: 是否只加载名称中包含分隔符的环境变量，用于与YAML配置合并时
+                忽略 PATH、HOME 等无关的顶层环境变量，默认为False
+            sections: 允许加载的顶层配置节名称，只加载去掉前缀后以 "<配置节>" + 分隔符 开头的环境变量，
+                用于忽略 __CF_USER_TEXT_ENCODING 或CI平台设置的无关环境变量，默认为None（不限制）
         """
         self.prefix = prefix
         self.separator = separator
+        self.nested_only = nested_only
+        self.sections = tuple(section.upper() + separator for section in sections) if sections is not None else None
+        self._loaded_fingerprint: Optional[tuple] = None
+        self._cached_config: Optional[dict] = None
+        # has_changed() 计算的指纹，紧接着调用 load_config() 时直接使用，避免再次遍历环境变量
+        self._checked_fingerprint: Optional[tuple] = None
+    
+    def _fingerprint(self) -> tuple:
+        """单次遍历环境变量，筛选出相关的环境变量。
+        
+        结果同时作为环境变量的指纹，用于判断是否需要重新解析。
+        
+        Returns:
+            tuple: 按名称排序的 (环境变量名, 值) 元组
+        """
+        prefix, separator, prefix_len, sections = self.prefix, self.separator, len(self.prefix), self.sections
+        return tuple(sorted(
+            (key, value) for key, value in os.environ.items()
+            if key.startswith(prefix) and (not self.nested_only or separator in key[prefix_len:])
+            and (sections is None or key[prefix_len:].upper().startswith(sections))
+        ))
+    
+    def has_changed(self) -> bool:
+        """判断相关环境变量自上次加载后是否发生变化。
+        
+        Returns:
+            bool: 环境变量是否已变化
+        """
+        self._checked_fingerprint = self._fingerprint()
+        return self._checked_fingerprint != self._loaded_fingerprint
     
     def load_config(self) -> dict:
         """从环境变量加载配置数据。
@@ -88,56 +223,213 @@ class EnvironmentConfigSource(ConfigSourceBase):
         环境变量 APP_CONFIG__DATABASE__HOST=localhost 将被转换为：
         {"app_config": {"database": {"host": "localhost"}}}
         
+        以数字作为层级名称的配置（如 USER_INFOS__0__COOKIE）保留为键为数字的字典，
+        由 deep_merge 按序号合并到已有列表中，没有对应列表时再转换为列表。
+        
+        解析结果会被缓存，相关环境变量未变化时直接返回缓存。
+        
         Returns:
             dict: 配置数据字典
         """
         try:
-            config = {}
-            pattern = re.compile(f"^{self.prefix}") if self.prefix else None
+            fingerprint, self._checked_fingerprint = self._checked_fingerprint, None
+            if fingerprint is None:
+                fingerprint = self._fingerprint()
+            if fingerprint == self._loaded_fingerprint and self._cached_config is not None:
+                return self._cached_config
             
-            for key, value in os.environ.items():
-                # 如果设置了前缀，则只处理匹配前缀的环境变量
-                if pattern and not pattern.match(key):
+            config = {}
+            prefix_len = len(self.prefix)
+            for key, value in fingerprint:
+                # 移除前缀，转换为小写并分割键名
+                parts = key[prefix_len:].lower().split(self.separator)
+                if not all(parts):
+                    # 名称以分隔符开头、结尾或包含连续分隔符，无法对应到配置项
                     continue
                 
-                # 移除前缀
-                if self.prefix:
-                    key = pattern.sub("", key)
-                
-                # 转换为小写并分割键名
-                key = key.lower()
-                parts = key.split(self.separator)
-                
-                # 递归设置嵌套值
+                # 递归设置嵌套值，与已有标量值冲突的键以嵌套结构为准
                 current = config
                 for part in parts[:-1]:
-                    current = current.setdefault(part, {})
-                current[parts[-1]] = value
+                    child = current.get(part)
+                    if not isinstance(child, dict):
+                        child = current[part] = {}
+                    current = child
+                if not isinstance(current.get(parts[-1]), dict):
+                    current[parts[-1]] = self._coerce_value(value)
             
-            return config
+            self._cached_config = config
+            self._loaded_fingerprint = fingerprint
+            return self._cached_config
         except Exception as e:
             logger.error(f"加载环境变量配置失败: {str(e)}")
             return {}
+    
+    @staticmethod
+    def _coerce_value(value: str) -> Any:
+        """按YAML语法解析环境变量值。
+        
+        true/false、数字、null 等标量解析为对应的Python类型，与YAML配置文件中的写法一致，
+        形如JSON数组或对象的值解析为列表或字典，例如 SMZDM__USER_INFOS='[{"name": "a", "cookie": "..."}]'。
+        解析失败、解析结果为其他类型（如日期）或以0开头的数字（如 "0123"，避免被当作八进制）保留原始字符串。
+        
+        Args:
+            value: 环境变量值
+            
+        Returns:
+            Any: 解析后的值
+        """
+        stripped = value.strip()
+        if not stripped:
+            return value
+        try:
+            parsed = yaml.load(stripped, Loader=YamlSafeLoader)
+        except yaml.YAMLError:
+            return value
+        if isinstance(parsed, (list, dict)):
+            return parsed if stripped[:1] in ('[', '{') else value
+        if isinstance(parsed, (int, float)) and not isinstance(parsed, bool):
+            digits = stripped.lstrip('+-')
+            if len(digits) > 1 and digits[0] == '0' and digits[1] != '.':
+                return value
+        if parsed is None or isinstance(parsed, (bool, int, float)):
+            return parsed
+        return value
+
+def _is_index_dict(node: Any) -> bool:
+    """判断是否为键全部为数字的字典（由 USER_INFOS__0__... 形式的环境变量生成）。"""
+    return isinstance(node, dict) and bool(node) and all(isinstance(key, str) and key.isdigit() for key in node)
+
+def _index_dict_to_list(node: Any) -> Any:
+    """将键全部为数字的字典递归转换为按序号排列的列表。"""
+    if not isinstance(node, dict):
+        return node
+    converted = {key: _index_dict_to_list(value) for key, value in node.items()}
+    if _is_index_dict(converted):
+        return [converted[key] for key in sorted(converted, key=int)]
+    return converted
+
+def deep_merge(base: dict, override: dict) -> dict:
+    """深度合并两个配置字典，返回新字典。
+    
+    两边都为字典的键递归合并；override中键全部为数字的字典按序号合并到base的列表中，
+    例如 {"user_infos": {"1": {"cookie": "..."}}} 只覆盖第二个账号的cookie，其他账号和字段保持不变，
+    base中没有对应列表时转换为列表。其余情况以override中的值为准。
+    
+    Args:
+        base: 基础配置字典
+        override: 覆盖配置字典
+        
+    Returns:
+        dict: 合并后的配置字典
+    """
+    merged = dict(base)
+    for key, value in override.items():
+        current = merged.get(key)
+        if _is_index_dict(value) and isinstance(current, list):
+            merged[key] = _merge_list(current, value)
+        elif isinstance(value, dict) and isinstance(current, dict):
+            merged[key] = deep_merge(current, value)
+        else:
+            merged[key] = _index_dict_to_list(value)
+    return merged
+
+def _merge_list(base: list, override: dict) -> list:
+    """将键为序号的字典按序号合并到列表中，序号超出列表长度的项按序号顺序追加到末尾。"""
+    merged = list(base)
+    for key in sorted(override, key=int):
+        index, value = int(key), override[key]
+        if index >= len(merged):
+            merged.append(_index_dict_to_list(value))
+        elif _is_index_dict(value) and isinstance(merged[index], list):
+            merged[index] = _merge_list(merged[index], value)
+        elif isinstance(value, dict) and isinstance(merged[index], dict):
+            merged[index] = deep_merge(merged[index], value)
+        else:
+            merged[index] = _index_dict_to_list(value)
+    return merged
+
+class CompositeConfigSource(ConfigSourceBase):
+    """组合配置源实现类。
+    
+    按优先级深度合并多个配置源，列表中靠后的配置源优先级更高。
+    每个配置源的数据单独缓存，重新加载时只重新读取发生变化的配置源。
+    
+    Attributes:
+        sources: 配置源列表，按优先级从低到高排列
+    """
+    
+    def __init__(self, sources: List[ConfigSourceBase]):
+        """初始化组合配置源。
+        
+        Args:
+            sources: 配置源列表，按优先级从低到高排列
+        """
+        self.sources = list(sources)
+        self._source_data: List[Optional[dict]] = [None] * len(self.sources)
+    
+    def has_changed(self) -> bool:
+        """判断是否有任一配置源发生变化。
+        
+        Returns:
+            bool: 是否有配置源已变化
+        """
+        return any(data is None or source.has_changed()
+                   for source, data in zip(self.sources, self._source_data))
+    
+    def load_config(self) -> dict:
+        """加载并合并所有配置源的数据。
+        
+        仅重新加载尚未加载或已发生变化的配置源，其余使用缓存数据。
+        
+        Returns:
+            dict: 合并后的配置数据字典
+        """
+        merged = {}
+        for index, source in enumerate(self.sources):
+            if self._source_data[index] is None or source.has_changed():
+                logger.debug(f"加载配置源: {type(source).__name__}")
+                self._source_data[index] = source.load_config()
+            merged = deep_merge(merged, self._source_data[index])
+        return merged
 
 class ConfigLoader:
     """配置加载器，用于管理和访问配置数据。
     
     支持从不同配置源加载配置数据，并提供统一的访问接口。
+    配置数据在首次访问时才会加载，之后缓存在实例中。
     """
     
     def __init__(self, config_source: Optional[ConfigSourceBase] = None):
         """初始化配置加载器。
         
         Args:
-            config_source: 配置源对象，如果为None则使用默认的YAML配置源
+            config_source: 配置源对象，如果为None则使用默认配置源：
+                YAML配置文件，并由 CONFIG_SECTIONS 中配置节对应的环境变量（如 SMZDM__...）覆盖
         """
         if config_source is None:
-            # 默认使用YAML配置源
             default_config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'app_config.yaml')
-            config_source = YamlConfigSource(default_config_path)
+            config_source = CompositeConfigSource([
+                YamlConfigSource(default_config_path),
+                EnvironmentConfigSource(nested_only=True, sections=CONFIG_SECTIONS),
+            ])
             
         self.config_source = config_source
-        self.config_data = self._load_config()
+        self._config_data: Optional[dict] = None
+        self._lock = threading.Lock()
+        self._watch_stop: Optional[threading.Event] = None
+    
+    @property
+    def config_data(self) -> dict:
+        """配置数据字典，首次访问时从配置源加载并缓存。
+
+        Returns:
+            dict: 配置数据字典
+        """
+        if self._config_data is None:
+            with self._lock:
+                if self._config_data is None:
+                    self._config_data = self._load_config()
+        return self._config_data
     
     def _load_config(self) -> dict:
         """加载配置数据。
@@ -147,6 +439,50 @@ class ConfigLoader:
         """
         return self.config_source.load_config()
     
+    def reload(self, force: bool = False) -> bool:
+        """在配置源发生变化时重新加载配置数据。
+        
+        Args:
+            force: 是否忽略变化检测强制重新加载
+            
+        Returns:
+            bool: 是否重新加载了配置
+        """
+        with self._lock:
+            if not force and self._config_data is not None and not self.config_source.has_changed():
+                return False
+            self._config_data = self._load_config()
+        logger.info("配置已重新加载")
+        return True
+    
+    def start_watch(self, interval: float = 5.0) -> None:
+        """启动后台线程，定期检查配置源并在变化时自动重新加载。
+        
+        适用于常驻进程，修改配置文件（如更新Cookie）后无需重启进程。
+        
+        Args:
+            interval: 检查间隔（秒），默认为5秒
+        """
+        if self._watch_stop is not None:
+            return
+        stop_event = threading.Event()
+        self._watch_stop = stop_event
+        
+        def _watch():
+            while not stop_event.wait(interval):
+                try:
+                    self.reload()
+                except Exception as e:
+                    logger.error(f"重新加载配置失败: {str(e)}")
+        
+        threading.Thread(target=_watch, name='config-watch', daemon=True).start()
+    
+    def stop_watch(self) -> None:
+        """停止配置监视线程。"""
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+            self._watch_stop = None
+    
     def get_app_configs(self, app_name: Optional[str] = None) -> Dict[str, Any]:
         """获取应用配置数据。
         
@@ -199,9 +535,18 @@ def set_config_source(config_source: ConfigSourceBase) -> None:
         config_source: 新的配置源对象
     """
     global config_loader
+    config_loader.stop_watch()
     config_loader = ConfigLoader(config_source)
 
-# 创建全局配置加载器实例
+def start_config_watch(interval: float = 5.0) -> None:
+    """启动全局配置加载器的配置监视线程的便捷函数。
+    
+    Args:
+        interval: 检查间隔（秒），默认为5秒
+    """
+    config_loader.start_watch(interval)
+
+# 创建全局配置加载器实例（延迟加载，首次访问配置时才读取文件）
 config_loader = ConfigLoader()
 
 # 导出便捷函数
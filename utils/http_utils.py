@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：http_utils.py
+描述：HTTP工具函数，提供进程内共享的连接池会话
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 每个主机保留的连接数
+POOL_MAXSIZE = 10
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(name: str = 'default') -> requests.Session:
+    """获取指定名称的共享会话。
+
+    同一进程内按名称复用 requests.Session，以保持连接池和TLS连接的复用。
+    共享会话不保存响应中的Cookie，避免多个账号之间互相串Cookie，
+    需要Cookie的请求应通过请求头显式传入。
+
+    Args:
+        name: 会话名称，不同用途（如青龙API、业务请求）可使用不同的会话
+
+    Returns:
+        requests.Session: 共享会话对象
+    """
+    session = _sessions.get(name)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(name)
+            if session is None:
+                session = requests.Session()
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = HTTPAdapter(pool_connections=POOL_MAXSIZE, pool_maxsize=POOL_MAXSIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _sessions[name] = session
+    return session
+
+
+def close_sessions() -> None:
+    """关闭所有共享会话，释放连接池。"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
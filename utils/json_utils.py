@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：json_utils.py
+描述：JSON解析工具，按 orjson > ujson > 标准库 的顺序使用已安装的JSON库
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+
+import json
+from typing import Any, Union
+
+import requests
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover - 可选依赖
+    ujson = None
+
+# 当前使用的JSON库名称
+BACKEND = 'orjson' if orjson is not None else 'ujson' if ujson is not None else 'json'
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """解析JSON。
+
+    可以直接传入响应的字节内容，省去解码为字符串的步骤。
+    第三方库解析失败时（如带BOM的内容）改用标准库重新解析。
+    超过64位的整数：较早版本的 orjson 会抛出异常，此时改用标准库解析为精确的 int；
+    较新版本（如3.8）则直接解析为浮点数并丢失精度，需要精确值的长ID应以字符串传递。
+
+    Args:
+        data: JSON文本或UTF-8编码的字节
+
+    Returns:
+        Any: 解析结果
+
+    Raises:
+        ValueError: JSON格式错误时抛出（json.JSONDecodeError 为其子类）
+    """
+    if isinstance(data, memoryview) and orjson is None:
+        data = data.tobytes()
+    try:
+        if orjson is not None:
+            return orjson.loads(data)
+        if ujson is not None:
+            return ujson.loads(data)
+    except ValueError:
+        pass
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """序列化为JSON字符串，非ASCII字符原样输出。
+
+    输出格式与 json.dumps 不完全相同（如分隔符后的空格），
+    需要固定格式的场景（签名、与服务端约定的字段）请直接使用标准库。
+
+    Args:
+        obj: 要序列化的对象
+        indent: 是否缩进两个空格，用于日志输出
+
+    Returns:
+        str: JSON字符串
+    """
+    try:
+        if orjson is not None:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode('utf-8')
+        if ujson is not None:
+            return ujson.dumps(obj, ensure_ascii=False, indent=2 if indent else 0)
+    except (TypeError, OverflowError):
+        pass
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+
+
+def response_json(response: requests.Response) -> Any:
+    """解析响应的JSON内容，替代 response.json()。
+
+    直接解析响应的原始字节，不经过 response.text 的编码检测和解码。
+
+    Args:
+        response: 请求响应对象
+
+    Returns:
+        Any: 解析结果
+
+    Raises:
+        requests.exceptions.JSONDecodeError: 响应内容不是合法的JSON时抛出，与 response.json() 一致
+    """
+    try:
+        return loads(response.content)
+    except ValueError as e:
+        raise requests.exceptions.JSONDecodeError(str(e), response.text, 0)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：log_utils.py
+描述：日志配置工具函数
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+
+import os
+import sys
+
+from loguru import logger
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def setup_logger(app: str) -> None:
+    """配置日志输出。
+
+    DEBUG及以上级别写入 logs/<app>_debug.log（按天轮转，保留7天），
+    INFO及以上级别输出到标准输出。
+
+    Args:
+        app: 应用名称，用于日志文件名
+    """
+    logger.remove()
+    logger.add(
+        os.path.join(project_root, "logs", f"{app}_debug.log"),
+        level="DEBUG",
+        rotation="1 day",
+        retention="7 days",
+        encoding="utf-8"
+    )
+    logger.add(
+        sys.stdout,
+        level="DEBUG",
+        filter=lambda record: record['level'].name != "DEBUG"
+    )
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：metrics.py
+描述：HTTP请求耗时统计，按主机和接口汇总请求次数、耗时、重试次数和等待时间，
+      支持导出Prometheus文本格式和JSONL明细
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+from utils.config import get_common_settings
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class RequestStats:
+    """单个主机、接口的累计统计。"""
+
+    # 耗时直方图的桶上限（秒）
+    BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.ttfb_seconds = 0.0
+        self.sleep_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * len(self.BUCKETS)
+
+    def add(self, total: float, ttfb: Optional[float], retries: int, sleep: float, wait: float,
+            error: bool) -> None:
+        self.count += 1
+        self.errors += int(error)
+        self.retries += retries
+        self.total_seconds += total
+        self.ttfb_seconds += ttfb or 0.0
+        self.sleep_seconds += sleep
+        self.wait_seconds += wait
+        self.max_seconds = max(self.max_seconds, total)
+        for index, bound in enumerate(self.BUCKETS):
+            if total <= bound:
+                self.buckets[index] += 1
+
+
+class RequestMetrics:
+    """HTTP请求耗时统计。
+
+    每次逻辑请求（包含其全部重试）记录一条数据：
+    - total: 从第一次发送到最终返回的总耗时，包含限速和重试等待
+    - ttfb: 最后一次尝试从发送请求到收到响应头的时间（requests 的 response.elapsed）
+    - retries / sleep: 重试次数和重试前等待的总时间
+    - wait: 按主机限速器的等待时间
+
+    requests 不提供DNS解析、建立连接和TLS握手的分段耗时，这部分包含在 ttfb 中。
+
+    配置从 common.metrics 读取，例如：
+
+        metrics:
+          jsonl: logs/requests.jsonl          # 逐条记录请求明细
+          prometheus: logs/requests.prom      # 每次运行结束时写入汇总
+    """
+
+    def __init__(self, settings: Optional[dict] = None):
+        """初始化统计对象。
+
+        Args:
+            settings: 统计配置，格式同 common.metrics
+        """
+        settings = settings or {}
+        self.jsonl_path = self._resolve(settings.get('jsonl'))
+        self.prometheus_path = self._resolve(settings.get('prometheus'))
+        self._stats: Dict[Tuple[str, str, str], RequestStats] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _resolve(path: Optional[str]) -> Optional[str]:
+        if not path:
+            return None
+        return path if os.path.isabs(path) else os.path.join(project_root, path)
+
+    def record(self, method: str, url: str, status: Optional[int], total: float, ttfb: Optional[float] = None,
+               retries: int = 0, sleep: float = 0.0, wait: float = 0.0, error: Optional[str] = None) -> None:
+        """记录一次请求。
+
+        Args:
+            method: HTTP方法
+            url: 请求URL，统计时只保留主机和路径
+            status: 最终响应的状态码，请求异常时为None
+            total: 总耗时（秒）
+            ttfb: 最后一次尝试收到响应头的耗时（秒）
+            retries: 重试次数
+            sleep: 重试等待的总时间（秒）
+            wait: 限速等待的总时间（秒）
+            error: 请求异常信息
+        """
+        parts = urlsplit(url)
+        key = (parts.hostname or '', parts.path or '/', method.upper())
+        failed = error is not None or status is None or status >= 400
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = RequestStats()
+            stats.add(total, ttfb, retries, sleep, wait, failed)
+            if self.jsonl_path:
+                self._append_jsonl({
+                    'time': round(time.time(), 3),
+                    'host': key[0],
+                    'endpoint': key[1],
+                    'method': key[2],
+                    'status': status,
+                    'total': round(total, 4),
+                    'ttfb': round(ttfb, 4) if ttfb is not None else None,
+                    'retries': retries,
+                    'sleep': round(sleep, 4),
+                    'wait': round(wait, 4),
+                    'error': error,
+                })
+
+    def _append_jsonl(self, record: dict) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.jsonl_path), exist_ok=True)
+            with open(self.jsonl_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except OSError as e:
+            logger.warning(f"写入请求明细失败，后续不再写入: {str(e)}")
+            self.jsonl_path = None
+
+    def reset(self) -> None:
+        """清空累计统计。"""
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> List[dict]:
+        """导出按总耗时降序排列的汇总数据。"""
+        with self._lock:
+            items = list(self._stats.items())
+        return sorted((
+            {
+                'host': host,
+                'endpoint': endpoint,
+                'method': method,
+                'count': stats.count,
+                'errors': stats.errors,
+                'retries': stats.retries,
+                'total_seconds': round(stats.total_seconds, 3),
+                'avg_seconds': round(stats.total_seconds / stats.count, 3),
+                'avg_ttfb_seconds': round(stats.ttfb_seconds / stats.count, 3),
+                'max_seconds': round(stats.max_seconds, 3),
+                'sleep_seconds': round(stats.sleep_seconds, 3),
+                'wait_seconds': round(stats.wait_seconds, 3),
+            }
+            for (host, endpoint, method), stats in items
+        ), key=lambda item: item['total_seconds'], reverse=True)
+
+    def prometheus(self) -> str:
+        """以Prometheus文本格式导出汇总数据。"""
+        lines: List[str] = [
+            '# TYPE script_http_request_duration_seconds histogram',
+            '# TYPE script_http_request_ttfb_seconds_total counter',
+            '# TYPE script_http_request_errors_total counter',
+            '# TYPE script_http_request_retries_total counter',
+            '# TYPE script_http_request_retry_sleep_seconds_total counter',
+            '# TYPE script_http_request_rate_limit_wait_seconds_total counter',
+        ]
+        with self._lock:
+            for (host, endpoint, method), stats in self._stats.items():
+                label = f'host="{host}",endpoint="{endpoint}",method="{method}"'
+                for bound, count in zip(RequestStats.BUCKETS, stats.buckets):
+                    lines.append(f'script_http_request_duration_seconds_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f'script_http_request_duration_seconds_bucket{{{label},le="+Inf"}} {stats.count}')
+                lines.append(f'script_http_request_duration_seconds_sum{{{label}}} {stats.total_seconds:.4f}')
+                lines.append(f'script_http_request_duration_seconds_count{{{label}}} {stats.count}')
+                lines.append(f'script_http_request_ttfb_seconds_total{{{label}}} {stats.ttfb_seconds:.4f}')
+                lines.append(f'script_http_request_errors_total{{{label}}} {stats.errors}')
+                lines.append(f'script_http_request_retries_total{{{label}}} {stats.retries}')
+                lines.append(f'script_http_request_retry_sleep_seconds_total{{{label}}} {stats.sleep_seconds:.4f}')
+                lines.append(f'script_http_request_rate_limit_wait_seconds_total{{{label}}} {stats.wait_seconds:.4f}')
+        return '\n'.join(lines) + '\n'
+
+    def log_summary(self, title: str, limit: int = 10) -> None:
+        """在日志中输出耗时最多的接口。
+
+        Args:
+            title: 日志标题
+            limit: 最多输出的接口数
+        """
+        snapshot = self.snapshot()
+        if not snapshot:
+            return
+        total = sum(item['total_seconds'] for item in snapshot)
+        logger.info(f"{title}: 共 {sum(item['count'] for item in snapshot)} 次请求，累计耗时 {total:.1f} 秒")
+        for item in snapshot[:limit]:
+            logger.info(
+                f"  {item['method']} {item['host']}{item['endpoint']}: {item['count']} 次，"
+                f"累计 {item['total_seconds']:.2f} 秒，平均 {item['avg_seconds']:.2f} 秒，"
+                f"限速等待 {item['wait_seconds']:.2f} 秒，重试 {item['retries']} 次，"
+                f"重试等待 {item['sleep_seconds']:.2f} 秒，失败 {item['errors']} 次"
+            )
+
+    def write_prometheus(self) -> bool:
+        """将汇总数据写入配置的Prometheus文本文件，可配合node_exporter的textfile采集器使用。
+
+        Returns:
+            bool: 是否写入成功，未配置文件路径时返回False
+        """
+        if not self.prometheus_path:
+            return False
+        try:
+            os.makedirs(os.path.dirname(self.prometheus_path), exist_ok=True)
+            tmp_path = f"{self.prometheus_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.prometheus())
+            os.replace(tmp_path, self.prometheus_path)
+            return True
+        except OSError as e:
+            logger.warning(f"写入请求统计失败: {str(e)}")
+            return False
+
+
+_request_metrics: Optional[RequestMetrics] = None
+_request_metrics_lock = threading.Lock()
+
+
+def get_request_metrics() -> RequestMetrics:
+    """获取进程内共享的请求统计对象，首次调用时按配置文件创建。
+
+    Returns:
+        RequestMetrics: 请求统计对象
+    """
+    global _request_metrics
+    if _request_metrics is None:
+        with _request_metrics_lock:
+            if _request_metrics is None:
+                _request_metrics = RequestMetrics(get_common_settings('metrics'))
+    return _request_metrics
@@ -5,32 +5,83 @@
 描述：消息推送工具函数
 作者：herryfish
 创建日期：2024-03-17
-最后修改：2024-03-17
+最后修改：2026-10-19
 """
 
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
 from loguru import logger
 
-def load_send(title: str, content: str) -> None:
+# 批量推送模式下暂存的消息，按标题分组
+_pending: Optional[Dict[str, List[str]]] = None
+_pending_lock = threading.Lock()
+
+def _send(title: str, content: str) -> bool:
+    """调用notify模块推送消息，notify模块不可用时返回False。"""
+    logger.info("加载推送功能中...")
+    try:
+        from notify import send
+        send(title, content)
+        logger.info("消息推送成功")
+        return True
+    except ImportError as e:
+        logger.error(f"❌导入notify模块失败: {str(e)}")
+        return False
+    except Exception as e:
+        logger.error(f"❌消息推送失败: {str(e)}")
+        raise
+
+def load_send(title: str, content: str, immediate: bool = False) -> bool:
     """加载并执行消息推送功能。
 
+    处于 notify_batch() 批量推送模式时，消息会先暂存，退出批量模式时统一推送。
+
     Args:
         title: 消息标题
         content: 消息内容
+        immediate: 是否忽略批量推送模式立即推送，需要根据推送结果更新状态时使用
 
     Returns:
-        None
+        bool: 消息是否已经送达；暂存到批量推送中或notify模块不可用时返回False
 
     Raises:
-        ImportError: 当notify模块导入失败时抛出
         Exception: 当消息推送失败时抛出
     """
-    logger.info("加载推送功能中...")
+    if not immediate:
+        with _pending_lock:
+            if _pending is not None:
+                _pending.setdefault(title, []).append(content)
+                return False
+    return _send(title, content)
+
+@contextmanager
+def notify_batch() -> Iterator[None]:
+    """批量推送模式的上下文管理器。
+
+    在同一进程内运行多个脚本时，将期间产生的消息按标题合并，
+    退出时每个标题只推送一次。
+
+    Example:
+        with notify_batch():
+            plugin_a.run()
+            plugin_b.run()
+    """
+    global _pending
+    with _pending_lock:
+        nested = _pending is not None
+        if not nested:
+            _pending = {}
     try:
-        from notify import send
-        send(title, content)
-        logger.info("消息推送成功")
-    except ImportError as e:
-        logger.error(f"❌导入notify模块失败: {str(e)}")
-    except Exception as e:
-        logger.error(f"❌消息推送失败: {str(e)}")
-        raise
\ No newline at end of file
+        yield
+    finally:
+        if not nested:
+            with _pending_lock:
+                pending, _pending = _pending, None
+            for title, contents in pending.items():
+                try:
+                    _send(title, '\n'.join(contents))
+                except Exception:
+                    # 单个标题推送失败不影响其他消息
+                    pass
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：plugin.py
+描述：脚本插件接口和注册表，供启动器和常驻进程在同一进程内运行多个脚本
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+
+import abc
+import contextvars
+import importlib
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Type
+
+from loguru import logger
+
+from utils.config import get_app_configs, get_user_infos
+from utils.metrics import get_request_metrics
+from utils.retry import get_retry_engine
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+scripts_dir = os.path.join(project_root, 'scripts')
+
+_plugins: Dict[str, Type['ScriptPlugin']] = {}
+
+
+class ScriptPlugin(abc.ABC):
+    """脚本插件基类。
+
+    子类设置 name 并实现 run_account，基类负责读取账号配置并执行。
+    应用配置中 concurrency 大于1时，多个账号并发执行。
+
+    Attributes:
+        name: 插件名称，同时也是配置文件中的应用名称
+        account_interval: 顺序执行时相邻两个账号之间的等待时间（秒）
+    """
+
+    name: str = ''
+    account_interval: float = 0
+
+    def accounts(self) -> List[Dict[str, Any]]:
+        """获取插件的账号列表。
+
+        Returns:
+            List[Dict[str, Any]]: 用户信息数据列表
+        """
+        return get_user_infos(self.name)
+
+    def app_configs(self) -> Dict[str, Any]:
+        """获取插件的应用配置。
+
+        Returns:
+            Dict[str, Any]: 应用配置数据字典
+        """
+        return get_app_configs(self.name)
+
+    def account_label(self, account: Dict[str, Any]) -> str:
+        """获取用于日志显示的账号名称。"""
+        return str(account.get('name', ''))
+
+    @abc.abstractmethod
+    def run_account(self, account: Dict[str, Any], app_configs: Dict[str, Any]) -> None:
+        """执行单个账号的任务。
+
+        Args:
+            account: 账号配置
+            app_configs: 应用配置
+        """
+
+    def run(self) -> bool:
+        """执行所有账号的任务，单个账号异常不影响其他账号。
+
+        Returns:
+            bool: 是否找到有效的账户配置信息
+        """
+        accounts = self.accounts()
+        app_configs = self.app_configs()
+        if not accounts:
+            logger.error(f"{self.name}: 未找到有效的账户配置信息")
+            return False
+
+        # 重试预算按单次运行计算，常驻进程中同时运行的其他插件使用各自的预算
+        with get_retry_engine().budget_scope():
+            return self._run_accounts(accounts, app_configs)
+
+    def _run_accounts(self, accounts: List[Dict[str, Any]], app_configs: Dict[str, Any]) -> bool:
+        """按配置的并发数执行所有账号的任务。"""
+        try:
+            concurrency = min(int(app_configs.get('concurrency', 1)), len(accounts))
+            if concurrency > 1:
+                with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=self.name) as executor:
+                    # 复制当前上下文，使账号线程共享本次运行的重试预算
+                    futures = [executor.submit(contextvars.copy_context().run, self._run_account_safely,
+                                               account, app_configs) for account in accounts]
+                    for future in futures:
+                        future.result()
+                return True
+
+            for index, account in enumerate(accounts):
+                if index and self.account_interval:
+                    time.sleep(self.account_interval)
+                self._run_account_safely(account, app_configs)
+            return True
+        finally:
+            metrics = get_request_metrics()
+            metrics.log_summary(f"{self.name}: 请求耗时统计（进程启动以来）")
+            metrics.write_prometheus()
+
+    def _run_account_safely(self, account: Dict[str, Any], app_configs: Dict[str, Any]) -> None:
+        """执行单个账号的任务并记录异常。"""
+        try:
+            self.run_account(account, app_configs)
+        except Exception as e:
+            logger.exception(f"{self.name}: 账号 {self.account_label(account)} 执行异常: {str(e)}")
+
+
+def register_plugin(cls: Type[ScriptPlugin]) -> Type[ScriptPlugin]:
+    """注册插件的类装饰器。"""
+    _plugins[cls.name] = cls
+    return cls
+
+
+def load_plugin(name: str) -> ScriptPlugin:
+    """按名称加载插件，必要时从 scripts 目录导入同名模块。
+
+    Args:
+        name: 插件名称
+
+    Returns:
+        ScriptPlugin: 插件实例
+
+    Raises:
+        KeyError: 模块中没有注册同名插件时抛出
+    """
+    if name not in _plugins:
+        if scripts_dir not in sys.path:
+            sys.path.insert(0, scripts_dir)
+        importlib.import_module(name)
+    return _plugins[name]()
+
+
+def available_plugins() -> List[str]:
+    """列出 scripts 目录中注册了插件的脚本名称。"""
+    names = []
+    for filename in sorted(os.listdir(scripts_dir)):
+        if filename.endswith('.py'):
+            with open(os.path.join(scripts_dir, filename), encoding='utf-8') as f:
+                if '@register_plugin' in f.read():
+                    names.append(filename[:-3])
+    return names
@@ -1,8 +1,13 @@
-import requests
 from typing import Optional, Dict, Any
 from loguru import logger
 import time
 from utils.config import get_common_settings
+from utils import json_utils
+from utils.http_utils import get_session
+from utils.retry import get_retry_engine
+
+# 进程内共享的访问令牌缓存，键为 (青龙地址, client_id)
+_token_cache: Dict[tuple, str] = {}
 
 class QLApi:
     """青龙面板 API 客户端"""
@@ -12,16 +17,16 @@ class QLApi:
         # 从配置文件加载青龙面板配置
         ql_config = get_common_settings('qinglong')
         
-        self.session = requests.Session()
+        self.session = get_session('qinglong')
         self.ql_host = ql_config.get('host', 'localhost:5700')
         self.client_id = ql_config.get('client_id', '')
         self.client_secret = ql_config.get('client_secret', '')
-        self.token: Optional[str] = None
+        self.token: Optional[str] = _token_cache.get((self.ql_host, self.client_id))
         
-        # 设置请求超时和重试
-        self.session.timeout = 10
+        # 设置请求超时和重试，重试间隔由统一的重试引擎控制
+        self.timeout = 10
         self.max_retries = 3
-        self.retry_delay = 5
+        self.retry_engine = get_retry_engine()
         
         # 设置通用请求头
         self.session.headers.update({
@@ -45,17 +50,17 @@ class QLApi:
         """
         if self.token:
             kwargs.setdefault('headers', {})['Authorization'] = self.token
+        kwargs.setdefault('timeout', self.timeout)
             
-        for attempt in range(self.max_retries):
-            try:
-                response = self.session.request(method, url, **kwargs)
-                response.raise_for_status()
-                return response.json()
-            except Exception as e:
-                logger.warning(f"Request failed (attempt {attempt + 1}/{self.max_retries}): {str(e)}")
-                if attempt == self.max_retries - 1:
-                    raise
-                time.sleep(self.retry_delay)
+        response = self.retry_engine.request(self.session, method, url, max_attempts=self.max_retries, **kwargs)
+        if response.status_code == 401 and self.token and '/open/auth/token' not in url:
+            # 缓存的令牌已失效，重新获取后重试
+            _token_cache.pop((self.ql_host, self.client_id), None)
+            if self.client_token():
+                kwargs['headers']['Authorization'] = self.token
+                response = self.retry_engine.request(self.session, method, url, max_attempts=self.max_retries, **kwargs)
+        response.raise_for_status()
+        return json_utils.response_json(response)
 
     def get_env(self, key: str) -> Optional[Dict[str, Any]]:
         """获取环境变量
@@ -69,8 +74,9 @@ class QLApi:
         if not self.token:
             self.client_token()
             
+        # searchValue 由青龙服务端按名称/值过滤，避免返回全部环境变量
         url = f'http://{self.ql_host}/open/envs'
-        response = self._make_request('GET', url)
+        response = self._make_request('GET', url, params={'searchValue': key})
         
         if not response.get('data'):
             logger.warning(f"No environment variables found for key: {key}")
@@ -81,12 +87,13 @@ class QLApi:
                 return env_data
         return None
 
-    def edit_env(self, key: str, value: str) -> bool:
+    def edit_env(self, key: str, value: str, expected_value: Optional[str] = None) -> bool:
         """编辑环境变量
         
         Args:
             key: 环境变量名称
             value: 新的值
+            expected_value: 期望的当前值，不为None时仅在当前值与其一致时才更新（比较并交换）
             
         Returns:
             bool: 更新是否成功
@@ -95,12 +102,29 @@ class QLApi:
         if not old_data:
             logger.error(f"Environment variable not found: {key}")
             return False
+        
+        if expected_value is not None and old_data.get('value') != expected_value:
+            logger.warning(f"Environment variable changed by others, skip updating: {key}")
+            return False
 
+        return self.update_env(old_data, value)
+
+    def update_env(self, env_data: Dict[str, Any], value: str) -> bool:
+        """使用已获取的环境变量信息更新其值
+        
+        Args:
+            env_data: get_env 返回的环境变量信息
+            value: 新的值
+            
+        Returns:
+            bool: 更新是否成功
+        """
+        key = env_data['name']
         new_data = {
-            'name': old_data['name'],
+            'name': env_data['name'],
             'value': value,
-            'remarks': old_data.get('remarks', ''),
-            'id': old_data['id']
+            'remarks': env_data.get('remarks', ''),
+            'id': env_data['id']
         }
 
         # 使用本地时间戳替代 get_timestamp
@@ -127,10 +151,12 @@ class QLApi:
         url = (f'http://{self.ql_host}/open/auth/token'
                f'?client_id={self.client_id}&client_secret={self.client_secret}')
         try:
+            self.token = None
             response = self._make_request('GET', url)
             if response.get('code') == 200:
                 token_data = response['data']
                 self.token = f"{token_data['token_type']} {token_data['token']}"
+                _token_cache[(self.ql_host, self.client_id)] = self.token
                 logger.debug("Successfully obtained new token")
                 return True
             return False
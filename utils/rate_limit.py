@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：rate_limit.py
+描述：请求限速工具，提供按主机的令牌桶限速器和自适应节奏控制器
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from utils.config import get_common_settings
+
+
+class TokenBucket:
+    """令牌桶。
+
+    令牌以 rate 个/秒的速度补充，最多累积 burst 个。取令牌时采用预约方式：
+    令牌不足时先扣减（允许为负），再等待补足所需的时间，因此多个线程或协程
+    同时请求时会按先后顺序依次放行。
+
+    Attributes:
+        rate: 每秒补充的令牌数
+        burst: 令牌桶容量，即允许的突发请求数
+    """
+
+    def __init__(self, rate: float, burst: float = 1):
+        """初始化令牌桶。
+
+        Args:
+            rate: 每秒补充的令牌数，必须大于0
+            burst: 令牌桶容量
+        """
+        if rate <= 0:
+            raise ValueError(f"令牌补充速度必须大于0: {rate}")
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """预约令牌，返回需要等待的时间。
+
+        Args:
+            tokens: 需要的令牌数
+
+        Returns:
+            float: 需要等待的时间（秒）
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self, tokens: float = 1) -> float:
+        """阻塞直到获得令牌，适用于多线程。
+
+        Returns:
+            float: 实际等待的时间（秒）
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """异步等待直到获得令牌，适用于asyncio。
+
+        Returns:
+            float: 实际等待的时间（秒）
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class RateLimiter:
+    """按主机分配令牌桶的限速器。
+
+    限制从配置文件 common.rate_limit 读取，例如：
+
+        rate_limit:
+          default: {rate: 5, burst: 5}       # 未单独配置的主机，不配置时不限速
+          hosts:
+            zhiyou.smzdm.com: {rate: 0.5, burst: 1}
+
+    脚本可通过 set_default_limit 为自己访问的主机提供默认限制，配置文件中的设置优先。
+    需要与主机的其他请求分开限速的请求（如允许一定并发的签到请求）可以使用自定义的限速键，
+    为该键设置默认限制后，在 wait 中传入该键。
+    """
+
+    def __init__(self, settings: Optional[dict] = None):
+        """初始化限速器。
+
+        Args:
+            settings: 限速配置，格式同 common.rate_limit
+        """
+        settings = settings or {}
+        default = settings.get('default')
+        self._default_limit = self._parse_limit(default) if default else None
+        self._host_limits: Dict[str, Tuple[float, float]] = {
+            host: self._parse_limit(limit) for host, limit in (settings.get('hosts') or {}).items()
+        }
+        self._configured_hosts = set(self._host_limits)
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _parse_limit(limit: dict) -> Tuple[float, float]:
+        return float(limit['rate']), float(limit.get('burst', 1))
+
+    def set_default_limit(self, host: str, rate: Optional[float], burst: float = 1) -> None:
+        """为主机设置默认限制，配置文件中已配置该主机时不生效。
+
+        Args:
+            host: 主机名或自定义的限速键
+            rate: 每秒允许的请求数，为None时取消之前设置的默认限制（按 common.rate_limit.default 处理）
+            burst: 允许的突发请求数
+        """
+        with self._lock:
+            if host in self._configured_hosts:
+                return
+            if rate is None:
+                if self._host_limits.pop(host, None) is not None:
+                    self._buckets.pop(host, None)
+            elif self._host_limits.get(host) != (rate, burst):
+                self._host_limits[host] = (rate, burst)
+                self._buckets.pop(host, None)
+
+    def _bucket(self, url: str, key: Optional[str] = None) -> Optional[TokenBucket]:
+        """获取限速键（默认为URL所在主机）的令牌桶，不限速时返回None。"""
+        host = key or urlsplit(url).hostname or ''
+        bucket = self._buckets.get(host, False)
+        if bucket is False:
+            with self._lock:
+                limit = self._host_limits.get(host, self._default_limit)
+                bucket = self._buckets.setdefault(host, TokenBucket(*limit) if limit else None)
+        return bucket
+
+    def wait(self, url: str, key: Optional[str] = None) -> float:
+        """阻塞直到允许向URL所在主机发送请求。
+
+        Args:
+            url: 请求URL
+            key: 自定义的限速键，为None时按URL所在主机限速
+
+        Returns:
+            float: 实际等待的时间（秒）
+        """
+        bucket = self._bucket(url, key)
+        return bucket.acquire() if bucket else 0.0
+
+    async def wait_async(self, url: str, key: Optional[str] = None) -> float:
+        """异步等待直到允许向URL所在主机发送请求。
+
+        Args:
+            url: 请求URL
+            key: 自定义的限速键，为None时按URL所在主机限速
+
+        Returns:
+            float: 实际等待的时间（秒）
+        """
+        bucket = self._bucket(url, key)
+        return await bucket.acquire_async() if bucket else 0.0
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """获取进程内共享的限速器，首次调用时按配置文件创建。
+
+    Returns:
+        RateLimiter: 限速器对象
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter(get_common_settings('rate_limit'))
+    return _rate_limiter
+
+
+class AdaptiveRateController:
+    """根据服务端响应自适应调整请求间隔的控制器。
+
+    收到错误或验证码等需要退避的响应时，间隔按倍数增大；
+    请求成功时，间隔按比例逐步恢复，直至最小间隔。可在多个线程间共享。
+
+    Attributes:
+        min_delay: 最小请求间隔（秒）
+        max_delay: 最大请求间隔（秒）
+        delay: 当前请求间隔（秒）
+    """
+
+    def __init__(self, min_delay: float = 0.0, max_delay: float = 30.0,
+                 backoff_factor: float = 2.0, recover_factor: float = 0.5, backoff_step: float = 1.0):
+        """初始化控制器。
+
+        Args:
+            min_delay: 最小请求间隔（秒）
+            max_delay: 最大请求间隔（秒）
+            backoff_factor: 退避时间隔的放大倍数
+            recover_factor: 成功时间隔的缩小比例
+            backoff_step: 从最小间隔首次退避时的间隔（秒）
+        """
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+        self.recover_factor = recover_factor
+        self.backoff_step = backoff_step
+        self.delay = min_delay
+        self._next_allowed = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> float:
+        """阻塞直到距上一次请求已超过当前间隔。
+
+        Returns:
+            float: 实际等待的时间（秒）
+        """
+        with self._lock:
+            now = time.monotonic()
+            scheduled = max(now, self._next_allowed)
+            self._next_allowed = scheduled + self.delay
+        delay = scheduled - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def on_success(self) -> None:
+        """记录一次成功响应，逐步缩小请求间隔。"""
+        with self._lock:
+            self.delay = max(self.min_delay, self.delay * self.recover_factor)
+            if self.delay < self.backoff_step / 4:
+                self.delay = self.min_delay
+
+    def on_backoff(self) -> None:
+        """记录一次需要退避的响应，放大请求间隔。"""
+        with self._lock:
+            self.delay = min(self.max_delay, max(self.backoff_step, self.delay * self.backoff_factor))
+            self._next_allowed = time.monotonic() + self.delay
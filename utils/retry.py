@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：retry.py
+描述：统一的HTTP请求重试策略，包含指数退避、随机抖动、单次运行的重试预算、
+      Retry-After 支持、幂等性判断和按主机的熔断器
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+
+import contextlib
+import contextvars
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+from loguru import logger
+
+from utils.config import get_common_settings
+from utils.metrics import get_request_metrics
+from utils.rate_limit import get_rate_limiter
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """主机熔断期间发起请求时抛出的异常。"""
+
+
+class CircuitBreaker:
+    """单个主机的熔断器。
+
+    连续失败达到阈值后熔断，熔断期间的请求直接失败；
+    超过冷却时间后放行一个探测请求，成功则恢复；失败、被限流或抛出异常时继续熔断。
+
+    Attributes:
+        failure_threshold: 触发熔断的连续失败次数
+        reset_timeout: 熔断冷却时间（秒）
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._probe_thread: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """判断是否允许发起请求，冷却结束后只放行调用线程的一个探测请求。"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._probing and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._probing = True
+                self._probe_thread = threading.get_ident()
+                return True
+            return False
+
+    def end_probe(self) -> None:
+        """结束当前线程的探测请求。
+
+        探测请求既未记录成功也未记录失败（如收到429或抛出异常）时按失败处理，重新开始冷却，
+        避免熔断器一直停留在探测状态。其他线程持有的探测不受影响。
+        """
+        with self._lock:
+            if self._probing and self._probe_thread == threading.get_ident():
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+class RetryBudget:
+    """单次运行的重试预算，可在同一次运行的多个线程间共享。
+
+    Attributes:
+        total: 重试总次数上限
+    """
+
+    def __init__(self, total: int):
+        self.total = total
+        self._remaining = total
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> int:
+        """剩余的重试次数。"""
+        return self._remaining
+
+    def consume(self) -> bool:
+        """消耗一次重试机会。
+
+        Returns:
+            bool: 预算未用完时返回True
+        """
+        with self._lock:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            return True
+
+
+# 当前运行的重试预算，由 RetryEngine.budget_scope() 设置
+_current_budget: contextvars.ContextVar[Optional[RetryBudget]] = contextvars.ContextVar('retry_budget', default=None)
+
+
+class RetryEngine:
+    """HTTP请求重试引擎。
+
+    - 可重试的错误：网络错误、超时，以及 retry_statuses 中的状态码
+    - 非幂等请求（签到、抽奖、领取奖励等）只在请求确定未被服务端处理时重试：
+      连接超时，或带 Retry-After 的 429/503 响应
+    - 重试等待时间为指数退避加随机抖动，响应带 Retry-After 时以其为准，不超过 max_delay
+    - 单次运行的重试总次数受 budget 限制，主机持续失败时由熔断器快速失败；
+      每次运行在 budget_scope() 中使用独立的预算，常驻进程中同时运行的任务互不影响
+    - 每次请求的耗时、重试次数和等待时间记录到 utils.metrics 的请求统计中
+
+    配置从 common.retry 读取，例如：
+
+        retry:
+          max_attempts: 3
+          base_delay: 2
+          max_delay: 30
+          budget: 50
+          breaker_threshold: 5
+          breaker_reset: 60
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, settings: Optional[dict] = None):
+        """初始化重试引擎。
+
+        Args:
+            settings: 重试配置，格式同 common.retry
+        """
+        settings = settings or {}
+        self.max_attempts = int(settings.get('max_attempts', 3))
+        self.base_delay = float(settings.get('base_delay', 2))
+        self.max_delay = float(settings.get('max_delay', 30))
+        self.jitter = float(settings.get('jitter', 0.5))
+        self.budget = int(settings.get('budget', 50))
+        self.breaker_threshold = int(settings.get('breaker_threshold', 5))
+        self.breaker_reset = float(settings.get('breaker_reset', 60))
+        # 不在 budget_scope() 中发起的请求共用的预算
+        self._default_budget = RetryBudget(self.budget)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def budget_scope(self) -> Iterator[RetryBudget]:
+        """为一次运行创建独立的重试预算。
+
+        预算保存在上下文变量中，在 with 块内（以及通过 contextvars.copy_context() 传递上下文的线程中）
+        发起的请求共享该预算。
+
+        Yields:
+            RetryBudget: 本次运行的重试预算
+        """
+        budget = RetryBudget(self.budget)
+        token = _current_budget.set(budget)
+        try:
+            yield budget
+        finally:
+            _current_budget.reset(token)
+
+    def _consume_budget(self) -> bool:
+        return (_current_budget.get() or self._default_budget).consume()
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+            return breaker
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """解析响应中的 Retry-After 头，返回等待秒数。"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def request(self, session: requests.Session, method: str, url: str, idempotent: bool = True,
+                max_attempts: Optional[int] = None, rate_limited: bool = True, limit_key: Optional[str] = None,
+                **kwargs) -> requests.Response:
+        """发送HTTP请求，按策略重试。
+
+        Args:
+            session: 发送请求使用的会话
+            method: HTTP方法
+            url: 请求URL
+            idempotent: 请求是否幂等，非幂等请求不会在可能已被处理时重放
+            max_attempts: 最大尝试次数，为None时使用配置值
+            rate_limited: 是否经过按主机限速器
+            limit_key: 自定义的限速键，为None时按URL所在主机限速
+            **kwargs: 其他请求参数
+
+        Returns:
+            requests.Response: 最后一次请求的响应，不会因HTTP状态码抛出异常
+
+        Raises:
+            CircuitOpenError: 主机处于熔断状态时抛出
+            requests.RequestException: 请求异常且不再重试时抛出
+        """
+        host = urlsplit(url).hostname or ''
+        breaker = self._breaker(host)
+        attempts = max_attempts or self.max_attempts
+        start = time.perf_counter()
+        retries = 0
+        sleep = wait = 0.0
+        response = None
+        error = None
+        try:
+            for attempt in range(attempts):
+                if not breaker.allow():
+                    raise CircuitOpenError(f"主机 {host} 连续请求失败，已暂时熔断: {url}")
+                # 探测请求收到429等未记录结果的响应或抛出异常时，在 finally 中重新熔断
+                try:
+                    if rate_limited:
+                        wait += get_rate_limiter().wait(url, limit_key)
+
+                    retry_after = None
+                    response = None
+                    try:
+                        response = session.request(method, url, **kwargs)
+                    except requests.exceptions.RequestException as e:
+                        breaker.record_failure()
+                        # 连接超时说明请求未发出，非幂等请求也可以安全重试
+                        retryable = isinstance(e, (requests.ConnectionError, requests.Timeout)) and (
+                            idempotent or isinstance(e, requests.exceptions.ConnectTimeout))
+                        if not retryable or attempt == attempts - 1 or not self._consume_budget():
+                            raise
+                        reason = str(e)
+                    else:
+                        if response.status_code not in self.RETRY_STATUSES:
+                            breaker.record_success()
+                            return response
+                        if response.status_code >= 500:
+                            breaker.record_failure()
+                        retry_after = self._retry_after(response)
+                        # 非幂等请求只在服务端明确要求稍后重试时重放
+                        retryable = idempotent or (response.status_code in (429, 503) and retry_after is not None)
+                        if not retryable or attempt == attempts - 1 or not self._consume_budget():
+                            return response
+                        reason = f"状态码 {response.status_code}"
+                finally:
+                    breaker.end_probe()
+
+                delay = min(self.max_delay, retry_after) if retry_after is not None else self._backoff(attempt)
+                logger.warning(f"请求失败 (尝试 {attempt + 1}/{attempts}): {url} - {reason}，{delay:.1f} 秒后重试")
+                time.sleep(delay)
+                retries += 1
+                sleep += delay
+        except requests.exceptions.RequestException as e:
+            error = f"{type(e).__name__}: {str(e)}"
+            raise
+        finally:
+            get_request_metrics().record(
+                method, url,
+                status=response.status_code if response is not None else None,
+                total=time.perf_counter() - start,
+                ttfb=response.elapsed.total_seconds() if response is not None and response.elapsed else None,
+                retries=retries, sleep=sleep, wait=wait, error=error,
+            )
+
+
+_retry_engine: Optional[RetryEngine] = None
+_retry_engine_lock = threading.Lock()
+
+
+def get_retry_engine() -> RetryEngine:
+    """获取进程内共享的重试引擎，首次调用时按配置文件创建。
+
+    Returns:
+        RetryEngine: 重试引擎对象
+    """
+    global _retry_engine
+    if _retry_engine is None:
+        with _retry_engine_lock:
+            if _retry_engine is None:
+                _retry_engine = RetryEngine(get_common_settings('retry'))
+    return _retry_engine
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：scheduler.py
+描述：常驻进程使用的定时任务调度器，支持cron表达式、随机延迟和健康检查接口
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Set
+
+from loguru import logger
+
+from utils.metrics import get_request_metrics
+
+
+class CronExpression:
+    """五段式cron表达式（分 时 日 月 周）。
+
+    每段支持 `*`、`*/n`、`a-b`、`a-b/n`、`a,b,c` 及其组合，
+    周的取值范围为0-7，其中0和7均表示周日。
+    """
+
+    FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str):
+        """解析cron表达式。
+
+        Args:
+            expression: cron表达式，如 "30 8 * * *"
+
+        Raises:
+            ValueError: 表达式格式不正确时抛出
+        """
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron表达式必须包含5段: {expression}")
+        self.expression = expression
+        parsed = [self._parse_field(field, low, high) for field, (low, high) in zip(fields, self.FIELD_RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {day % 7 for day in weekdays}
+        # 日和周均被限制时，按cron惯例满足其一即可
+        self.day_restricted = fields[2] != '*'
+        self.weekday_restricted = fields[4] != '*'
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        """解析cron表达式中的单个字段。"""
+        values = set()
+        for part in field.split(','):
+            range_part, _, step_part = part.partition('/')
+            step = int(step_part) if step_part else 1
+            if range_part == '*':
+                start, end = low, high
+            elif '-' in range_part:
+                start, end = (int(value) for value in range_part.split('-', 1))
+            else:
+                start = end = int(range_part)
+                if step_part:
+                    end = high
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"cron字段超出范围: {field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        """判断日期是否满足日和周字段。"""
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, dt: datetime) -> datetime:
+        """计算给定时间之后的下一次触发时间。
+
+        Args:
+            dt: 起始时间
+
+        Returns:
+            datetime: 下一次触发时间（精确到分钟）
+
+        Raises:
+            ValueError: 五年内不存在触发时间时抛出
+        """
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate <= limit:
+            if candidate.month not in self.months:
+                year = candidate.year + candidate.month // 12
+                candidate = candidate.replace(year=year, month=candidate.month % 12 + 1, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"cron表达式没有可触发的时间: {self.expression}")
+
+
+class Job:
+    """调度任务及其运行统计。
+
+    Attributes:
+        name: 任务名称
+        func: 任务执行函数
+        cron: cron表达式
+        jitter: 随机延迟上限（秒），用于错开固定时间点的请求
+        next_run: 下一次计划运行时间
+        last_run: 上一次开始运行时间
+        last_duration: 上一次运行耗时（秒）
+        last_success: 上一次运行是否成功
+        run_count: 累计运行次数
+        fail_count: 累计失败次数
+        running: 是否正在运行
+    """
+
+    def __init__(self, name: str, func: Callable[[], object], cron: str, jitter: float = 0):
+        self.name = name
+        self.func = func
+        self.cron = CronExpression(cron)
+        self.jitter = jitter
+        self.next_run: Optional[datetime] = None
+        self.last_run: Optional[datetime] = None
+        self.last_duration = 0.0
+        self.last_success: Optional[bool] = None
+        self.run_count = 0
+        self.fail_count = 0
+        self.running = False
+
+    def schedule_next(self, now: datetime) -> None:
+        """根据cron表达式和随机延迟计算下一次运行时间。"""
+        self.next_run = self.cron.next_after(now) + timedelta(seconds=random.uniform(0, self.jitter))
+
+    def to_dict(self) -> dict:
+        """导出任务状态，用于健康检查接口。"""
+        return {
+            'name': self.name,
+            'cron': self.cron.expression,
+            'next_run': self.next_run.isoformat() if self.next_run else None,
+            'last_run': self.last_run.isoformat() if self.last_run else None,
+            'last_duration': round(self.last_duration, 3),
+            'last_success': self.last_success,
+            'run_count': self.run_count,
+            'fail_count': self.fail_count,
+            'running': self.running,
+        }
+
+
+class Scheduler:
+    """基于线程池的定时任务调度器。
+
+    同一任务不会并发运行，上一次运行未结束时跳过本次触发。
+    """
+
+    def __init__(self, max_workers: int = 2):
+        """初始化调度器。
+
+        Args:
+            max_workers: 同时运行的任务数上限
+        """
+        self.jobs: Dict[str, Job] = {}
+        self.started_at = datetime.now()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def add_job(self, name: str, func: Callable[[], object], cron: str, jitter: float = 0) -> Job:
+        """添加定时任务。
+
+        Args:
+            name: 任务名称
+            func: 任务执行函数，返回False或抛出异常视为失败
+            cron: cron表达式
+            jitter: 随机延迟上限（秒）
+
+        Returns:
+            Job: 任务对象
+        """
+        job = Job(name, func, cron, jitter)
+        job.schedule_next(datetime.now())
+        with self._lock:
+            self.jobs[name] = job
+        logger.info(f"添加任务 {name}({cron})，下次运行时间: {job.next_run:%Y-%m-%d %H:%M:%S}")
+        self._wakeup.set()
+        return job
+
+    def run_job_now(self, name: str) -> None:
+        """立即在后台运行指定任务。"""
+        self._submit(self.jobs[name])
+
+    def _submit(self, job: Job) -> None:
+        with self._lock:
+            if job.running:
+                logger.warning(f"任务 {job.name} 仍在运行，跳过本次触发")
+                return
+            job.running = True
+        self._executor.submit(self._run, job)
+
+    def _run(self, job: Job) -> None:
+        job.last_run = datetime.now()
+        start = time.perf_counter()
+        logger.info(f"开始运行任务 {job.name}")
+        try:
+            job.last_success = job.func() is not False
+        except BaseException as e:
+            job.last_success = False
+            logger.exception(f"任务 {job.name} 运行异常: {str(e)}")
+        finally:
+            job.last_duration = time.perf_counter() - start
+            job.run_count += 1
+            if not job.last_success:
+                job.fail_count += 1
+            job.running = False
+        logger.info(f"任务 {job.name} 运行结束，耗时 {job.last_duration:.1f} 秒")
+
+    def run_forever(self) -> None:
+        """进入调度循环，直到调用 stop() 为止。"""
+        while not self._stopped.is_set():
+            now = datetime.now()
+            with self._lock:
+                jobs = list(self.jobs.values())
+            for job in jobs:
+                if job.next_run <= now:
+                    job.schedule_next(now)
+                    self._submit(job)
+            next_runs = [job.next_run for job in jobs]
+            timeout = min((run - datetime.now()).total_seconds() for run in next_runs) if next_runs else 60
+            self._wakeup.wait(max(0.0, min(timeout, 60)))
+            self._wakeup.clear()
+        self._executor.shutdown(wait=True)
+
+    def stop(self) -> None:
+        """停止调度循环，等待正在运行的任务结束。"""
+        self._stopped.set()
+        self._wakeup.set()
+
+    def health(self) -> dict:
+        """导出调度器状态。"""
+        with self._lock:
+            jobs = [job.to_dict() for job in self.jobs.values()]
+        return {
+            'status': 'ok',
+            'started_at': self.started_at.isoformat(),
+            'uptime': round((datetime.now() - self.started_at).total_seconds(), 3),
+            'jobs': jobs,
+        }
+
+    def metrics(self) -> str:
+        """以Prometheus文本格式导出任务统计。"""
+        lines: List[str] = [
+            '# TYPE script_job_runs_total counter',
+            '# TYPE script_job_failures_total counter',
+            '# TYPE script_job_last_duration_seconds gauge',
+            '# TYPE script_job_running gauge',
+        ]
+        with self._lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            label = f'{{job="{job.name}"}}'
+            lines.append(f'script_job_runs_total{label} {job.run_count}')
+            lines.append(f'script_job_failures_total{label} {job.fail_count}')
+            lines.append(f'script_job_last_duration_seconds{label} {job.last_duration:.3f}')
+            lines.append(f'script_job_running{label} {int(job.running)}')
+        return '\n'.join(lines) + '\n'
+
+
+def start_health_server(scheduler: Scheduler, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """在后台线程启动健康检查HTTP服务。
+
+    提供 /health（JSON格式的任务状态）和 /metrics（Prometheus文本格式的任务和请求统计）两个接口。
+
+    Args:
+        scheduler: 调度器对象
+        host: 监听地址，默认只监听本机
+        port: 监听端口
+
+    Returns:
+        ThreadingHTTPServer: HTTP服务对象，可调用 shutdown() 停止
+    """
+
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/health':
+                body = json.dumps(scheduler.health(), ensure_ascii=False).encode('utf-8')
+                content_type = 'application/json; charset=utf-8'
+            elif self.path == '/metrics':
+                body = (scheduler.metrics() + get_request_metrics().prometheus()).encode('utf-8')
+                content_type = 'text/plain; version=0.0.4'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(f"健康检查请求: {format % args}")
+
+    server = ThreadingHTTPServer((host, port), HealthHandler)
+    threading.Thread(target=server.serve_forever, name='health-server', daemon=True).start()
+    logger.info(f"健康检查服务已启动: http://{host}:{port}/health")
+    return server
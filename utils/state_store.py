@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：state_store.py
+描述：脚本运行状态的存储工具
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from utils.qlapi import QLApi
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+# 本地状态文件目录
+DATA_DIR = os.path.join(project_root, 'data')
+
+
+def _write_text(path: str, text: str) -> None:
+    """原子写入文本文件。
+
+    先写入同目录下唯一命名的临时文件再替换目标文件，同一进程内多个线程同时写入时互不干扰。
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, prefix=os.path.basename(path) + '.',
+                                     suffix='.tmp', delete=False) as f:
+        tmp_path = f.name
+        f.write(text)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        os.remove(tmp_path)
+        raise
+
+
+def _write_json(path: str, data: dict) -> None:
+    """原子写入JSON文件。"""
+    _write_text(path, json.dumps(data, ensure_ascii=False))
+
+
+class QLEnvState:
+    """保存在青龙环境变量中的运行状态。
+
+    运行期间的修改先缓存在内存中，调用 commit() 时一次性写回青龙。
+    写回时采用比较并交换：仅当青龙中的值仍是本次加载时的值才会更新，
+    避免覆盖其他进程的修改。青龙不可达时状态写入本地文件，下次加载时优先使用并重新提交。
+
+    Attributes:
+        key: 环境变量名称
+        fallback_path: 本地备份文件路径
+    """
+
+    def __init__(self, key: str, qlapi: Optional[QLApi] = None):
+        """初始化状态对象。
+
+        Args:
+            key: 环境变量名称
+            qlapi: 青龙API客户端，为None时自动创建
+        """
+        self.key = key
+        self.qlapi = qlapi or QLApi()
+        self.fallback_path = os.path.join(DATA_DIR, f"qlenv_{key}.json")
+        self._base_value: Optional[str] = None
+        self._value: Optional[str] = None
+        self._dirty = False
+
+    def _read_fallback(self) -> Optional[dict]:
+        """读取本地备份文件，不存在或损坏时返回None。"""
+        try:
+            with open(self.fallback_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _remove_fallback(self) -> None:
+        if os.path.exists(self.fallback_path):
+            os.remove(self.fallback_path)
+
+    def load(self) -> Optional[str]:
+        """加载状态值。
+
+        Returns:
+            Optional[str]: 状态值，青龙和本地备份都不可用时返回None
+        """
+        fallback = self._read_fallback()
+        try:
+            env_data = self.qlapi.get_env(self.key)
+        except Exception as e:
+            logger.warning(f"读取青龙环境变量 {self.key} 失败: {str(e)}")
+            if fallback is None:
+                raise
+            logger.warning(f"使用本地备份的状态: {self.fallback_path}")
+            self._base_value = fallback['base']
+            self._value = fallback['value']
+            self._dirty = True
+            return self._value
+
+        self._base_value = env_data['value'] if env_data else None
+        self._value = self._base_value
+        self._dirty = False
+        if fallback is not None:
+            if fallback['base'] == self._base_value:
+                # 上次提交失败后青龙中的值未被修改，使用本地备份并在本次提交
+                logger.info(f"恢复上次未提交的状态: {self.fallback_path}")
+                self._value = fallback['value']
+                self._dirty = True
+            else:
+                logger.info(f"青龙中的状态已更新，丢弃本地备份: {self.fallback_path}")
+                self._remove_fallback()
+        return self._value
+
+    def set(self, value: str) -> None:
+        """修改状态值，修改只缓存在内存中，直到调用 commit()。
+
+        Args:
+            value: 新的状态值
+        """
+        if value != self._value:
+            self._value = value
+            self._dirty = True
+
+    def commit(self) -> bool:
+        """将修改写回青龙。
+
+        Returns:
+            bool: 是否写回成功（没有修改时也返回True）
+        """
+        if not self._dirty:
+            return True
+        try:
+            env_data = self.qlapi.get_env(self.key)
+        except Exception as e:
+            logger.error(f"读取青龙环境变量 {self.key} 失败，状态保存到本地: {str(e)}")
+            env_data = None
+        else:
+            if env_data is None:
+                logger.error(f"青龙环境变量不存在: {self.key}")
+                return False
+            if env_data.get('value') != self._base_value:
+                logger.warning(f"青龙环境变量 {self.key} 已被其他进程修改，放弃本次提交")
+                self._remove_fallback()
+                self._dirty = False
+                return False
+            if self.qlapi.update_env(env_data, self._value):
+                self._remove_fallback()
+                self._base_value = self._value
+                self._dirty = False
+                return True
+
+        _write_json(self.fallback_path, {
+            'base': self._base_value,
+            'value': self._value,
+            'saved_at': datetime.now().isoformat(),
+        })
+        return False
+
+
+class TaskLedger:
+    """按账号、按天记录任务进度的本地台账。
+
+    台账保存为只追加的JSON Lines文件，每次修改追加一行，进程在任意位置中断都不会损坏已记录的进度，
+    重新运行时回放文件即可恢复到中断前的状态。文件第一行记录日期，日期变化后台账自动清空。
+
+    Attributes:
+        app: 脚本名称
+        day: 台账日期（YYYY-MM-DD）
+        path: 台账文件路径
+    """
+
+    def __init__(self, app: str, account: str, day: Optional[str] = None):
+        """初始化并加载台账。
+
+        Args:
+            app: 脚本名称
+            account: 账号标识（账号名称或Cookie等），文件名中只使用其哈希值
+            day: 台账日期，默认为今天
+        """
+        self.app = app
+        self.day = day or date.today().isoformat()
+        account_key = hashlib.sha1(account.encode('utf-8')).hexdigest()[:16]
+        self.path = os.path.join(DATA_DIR, f"ledger_{app}_{account_key}.jsonl")
+        self._entries: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """回放台账文件，文件不是当天的则重新创建。"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            lines = []
+
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # 中断时可能留下不完整的最后一行
+                logger.warning(f"忽略台账中损坏的记录: {self.path}")
+        if records and records[0].get('day') == self.day:
+            for record in records[1:]:
+                self._entries[record['k']] = record['v']
+            return
+
+        _write_text(self.path, json.dumps({'day': self.day}) + '\n')
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """获取记录的值。"""
+        with self._lock:
+            return self._entries.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        """记录一个值并立即追加到台账文件。
+
+        Args:
+            key: 记录名称
+            value: 可JSON序列化的值，为None表示删除记录
+        """
+        with self._lock:
+            self._set(key, value)
+
+    def _set(self, key: str, value: Any) -> None:
+        if self._entries.get(key) == value:
+            return
+        if value is None:
+            self._entries.pop(key, None)
+        else:
+            self._entries[key] = value
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'k': key, 'v': value}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def is_done(self, key: str) -> bool:
+        """判断任务是否已完成。"""
+        return self.get(key) is True
+
+    def mark_done(self, key: str) -> None:
+        """标记任务已完成。"""
+        self.set(key, True)
+
+    def increment(self, key: str, amount: int = 1) -> int:
+        """累加计数并返回累加后的值。"""
+        with self._lock:
+            value = int(self._entries.get(key, 0)) + amount
+            self._set(key, value)
+            return value
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名：text_utils.py
+描述：文本处理工具，提供预编译的HTML清理函数、批量清理接口和重复消息的缓存
+作者：herryfish
+创建日期：2026-10-19
+最后修改：2026-10-19
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List
+
+# HTML标签
+TAG_PATTERN = re.compile(r'<[^>]+>')
+# 标签之间的文本，如 <span>经验<strong>+10</strong></span> 中的 "经验" 和 "+10"
+TAG_TEXT_PATTERN = re.compile(r'>([^<]+)<')
+# 批量清理时拼接各条消息使用的分隔符，不会出现在接口返回的文本中；
+# 批量清理使用的标签模式不跨越分隔符，未闭合的 "<" 不会吞掉下一条消息
+_BATCH_SEPARATOR = '\x00'
+_BATCH_TAG_PATTERN = re.compile(r'<[^>\x00]+>')
+
+
+@lru_cache(maxsize=1024)
+def clean_html(html_string: str) -> str:
+    """去除字符串中的HTML标签及首尾空白。
+
+    奖励消息在各账号之间大量重复，结果按输入缓存。
+
+    Args:
+        html_string: 包含HTML标签的字符串
+
+    Returns:
+        str: 去除标签后的文本
+    """
+    return TAG_PATTERN.sub('', html_string).strip()
+
+
+@lru_cache(maxsize=1024)
+def extract_tag_text(html_string: str) -> str:
+    """提取并拼接HTML标签之间的文本。
+
+    与 clean_html 不同，不在任何标签内的首尾文本会被忽略。
+
+    Args:
+        html_string: HTML片段
+
+    Returns:
+        str: 标签之间文本的拼接结果
+    """
+    return ''.join(TAG_TEXT_PATTERN.findall(html_string))
+
+
+def clean_html_batch(html_strings: Iterable[str]) -> List[str]:
+    """批量去除HTML标签。
+
+    相同的消息只处理一次，其余消息拼接后由一次正则替换完成。
+
+    Args:
+        html_strings: 包含HTML标签的字符串序列
+
+    Returns:
+        List[str]: 与输入顺序一致的清理结果
+    """
+    html_strings = list(html_strings)
+    unique = list(dict.fromkeys(html_strings))
+    if not unique:
+        return []
+    if any(_BATCH_SEPARATOR in text for text in unique):
+        cleaned = [clean_html(text) for text in unique]
+    else:
+        joined = _BATCH_TAG_PATTERN.sub('', _BATCH_SEPARATOR.join(unique))
+        cleaned = [text.strip() for text in joined.split(_BATCH_SEPARATOR)]
+    mapping = dict(zip(unique, cleaned))
+    return [mapping[text] for text in html_strings]